@@ -1,9 +1,21 @@
 import os
-from openai import OpenAI
+import sys
+import json
+import time
+import asyncio
+from pathlib import Path
+from openai import AsyncOpenAI
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# libuv-based event loop where available; the stdlib loop is the fallback
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 FREE_MODELS = [
     "google/gemini-flash-1.5:free",
     "google/gemini-flash-1.5-8b:free",
@@ -12,29 +24,84 @@ FREE_MODELS = [
     "meta-llama/llama-3.2-1b-instruct:free",
 ]
 
-client = OpenAI(
+MAX_CONCURRENCY = 5
+PROBE_TIMEOUT = 10  # seconds per model
+
+CACHE_FILE = Path(".cache/recommended_model.json")
+CACHE_TTL = 24 * 60 * 60  # re-probe once a day
+
+client = AsyncOpenAI(
     base_url="https://openrouter.ai/api/v1",
     api_key=os.getenv("OPENROUTER_API_KEY"),
 )
 
-print("Testing all free models...\n")
+async def probe(model, sem):
+    """Send a tiny prompt to one model and return its reply"""
+    async with sem:
+        response = await asyncio.wait_for(
+            client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": "Say 'Hello!'"}],
+                max_tokens=10
+            ),
+            timeout=PROBE_TIMEOUT
+        )
+        return response.choices[0].message.content
 
-for model in FREE_MODELS:
+def load_cached_model():
+    """Return the last recommended model if it was found within CACHE_TTL"""
     try:
+        cached = json.loads(CACHE_FILE.read_text())
+    except (OSError, ValueError):
+        return None
+    if time.time() - cached.get("ts", 0) < CACHE_TTL:
+        return cached.get("model")
+    return None
+
+def save_cached_model(model):
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    CACHE_FILE.write_text(json.dumps({"model": model, "ts": time.time()}))
+
+async def main(force=False):
+    if not force:
+        cached = load_cached_model()
+        if cached:
+            print(f"🎉 RECOMMENDED MODEL (cached): {cached}")
+            print("   Run with --force to re-test all models")
+            return cached
+
+    print("Testing all free models...\n")
+
+    # Fire all probes at once; wall-clock is the slowest probe, not the sum
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+    results = await asyncio.gather(
+        *[probe(model, sem) for model in FREE_MODELS],
+        return_exceptions=True
+    )
+
+    recommended = None
+    for model, result in zip(FREE_MODELS, results):
         print(f"Testing {model}...")
-        response = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": "Say 'Hello!'"}],
-            max_tokens=10
-        )
-        print(f"✅ SUCCESS: {response.choices[0].message.content}\n")
-        print(f"🎉 RECOMMENDED MODEL: {model}\n")
-        break
-    except Exception as e:
-        error_str = str(e)
-        if "429" in error_str or "rate" in error_str.lower():
-            print(f"⚠️  Rate limited\n")
+        if isinstance(result, Exception):
+            error_str = str(result)
+            if isinstance(result, asyncio.TimeoutError):
+                print(f"⏱️  Timed out after {PROBE_TIMEOUT}s\n")
+            elif "429" in error_str or "rate" in error_str.lower():
+                print(f"⚠️  Rate limited\n")
+            else:
+                print(f"❌ Error: {error_str[:100]}\n")
         else:
-            print(f"❌ Error: {str(e)[:100]}\n")
+            print(f"✅ SUCCESS: {result}\n")
+            if recommended is None:
+                recommended = model
+
+    # FREE_MODELS is in preference order, so the first success wins
+    if recommended:
+        print(f"🎉 RECOMMENDED MODEL: {recommended}\n")
+        save_cached_model(recommended)
+
+    print("=" * 60)
+    return recommended
 
-print("=" * 60)
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(main(force="--force" in sys.argv[1:]))
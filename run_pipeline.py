@@ -3,9 +3,23 @@ Health Compass Data Pipeline
 Run this once to collect and process health data
 """
 
+import json
+import os
+import queue
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from tqdm import tqdm
+
+# Size the OpenMP/MKL thread pools before anything below imports torch;
+# the defaults can leave most cores idle during CPU embedding
+CPU_THREADS = os.cpu_count() or 1
+os.environ.setdefault("OMP_NUM_THREADS", str(CPU_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(CPU_THREADS))
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
@@ -15,14 +29,66 @@ from src.processors.text_processor import TextProcessor
 from src.rag.vector_db import FreeVectorDB
 from src.utils.config import Config
 
+SEP = "=" * 70
+
+def stage_banner(title):
+    """Build a stage header block"""
+    return f"\n{SEP}\n{title}\n{SEP}\n"
+
+BANNER = (
+    f"\n{SEP}\n"
+    "🏥 HEALTH COMPASS - DATA PIPELINE\n"
+    f"{SEP}\n"
+    "This will collect and process health information from trusted sources.\n"
+    "Estimated time: 10-15 minutes\n"
+    f"{SEP}\n"
+)
+SCRAPE_BANNER = stage_banner("STEP 1: DATA COLLECTION")
+INDEX_BANNER = stage_banner("STEP 2-3: DATA PROCESSING & BUILDING VECTOR DATABASE")
+TEST_BANNER = stage_banner("STEP 4: SYSTEM TEST")
+COMPLETE_BANNER = (
+    f"\n{SEP}\n"
+    "✅ SETUP COMPLETE!\n"
+    f"{SEP}\n"
+    "\nYou can now run the Health Compass app:\n"
+    "   streamlit run src/app.py\n"
+    "\nOr test the RAG system:\n"
+    "   python -m src.rag.rag_pipeline\n"
+    f"\n{SEP}\n"
+)
+
+class QueuedStdout:
+    """Stdout wrapper that hands writes to a single daemon writer thread
+    
+    Scraper worker threads only enqueue text, so they never block on a slow
+    terminal. flush() waits until everything queued so far has been written.
+    """
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self.queue = queue.Queue()
+        threading.Thread(target=self._drain, daemon=True).start()
+    
+    def _drain(self):
+        while True:
+            text = self.queue.get()
+            self.stream.write(text)
+            self.stream.flush()
+            self.queue.task_done()
+    
+    def write(self, text):
+        self.queue.put(text)
+        return len(text)
+    
+    def flush(self):
+        self.queue.join()
+    
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
 def print_banner():
     """Print welcome banner"""
-    print("\n" + "="*70)
-    print("🏥 HEALTH COMPASS - DATA PIPELINE")
-    print("="*70)
-    print("This will collect and process health information from trusted sources.")
-    print("Estimated time: 10-15 minutes")
-    print("="*70 + "\n")
+    print(BANNER)
 
 def validate_setup():
     """Check if everything is set up correctly"""
@@ -37,87 +103,123 @@ def validate_setup():
         print("\nPlease fix these issues and try again.")
         return False
     
-    print("✅ Setup validated successfully!\n")
+    print("✅ Setup validated successfully!")
+    
+    import torch
+    torch.set_num_threads(CPU_THREADS)
+    try:
+        torch.set_num_interop_threads(max(1, CPU_THREADS // 4))
+    except RuntimeError:
+        pass  # Already fixed once torch has started parallel work
+    print(f"🧵 Torch threads: {torch.get_num_threads()} intra-op, "
+          f"{torch.get_num_interop_threads()} inter-op\n")
     return True
 
 def run_scraping(limit=50):
     """Step 1: Scrape data from medical websites"""
-    print("\n" + "="*70)
-    print("STEP 1: DATA COLLECTION")
-    print("="*70 + "\n")
+    print(SCRAPE_BANNER)
     
-    # Scrape MedlinePlus
+    # Both scrapers are I/O-bound and share no state (each is constructed
+    # fresh here), so run them side by side instead of one after the other
     print("📥 Scraping MedlinePlus (U.S. National Library of Medicine)...")
-    medline_scraper = MedlinePlusScraper()
-    medline_count = medline_scraper.scrape_all(limit=limit)
-    print(f"✅ MedlinePlus: {medline_count} topics collected\n")
-    
-    # Scrape CDC
     print("📥 Scraping CDC (Centers for Disease Control and Prevention)...")
+    medline_scraper = MedlinePlusScraper()
     cdc_scraper = CDCScraper()
-    cdc_count = cdc_scraper.scrape_all(limit=limit)
-    print(f"✅ CDC: {cdc_count} pages collected\n")
-    
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        medline_future = executor.submit(medline_scraper.scrape_all, limit=limit)
+        cdc_future = executor.submit(cdc_scraper.scrape_all, limit=limit)
+
+        # Tick the stage bar as each source finishes
+        with tqdm(total=2, desc="scrape", unit="source") as pbar:
+            medline_future.add_done_callback(lambda f: pbar.update(1))
+            cdc_future.add_done_callback(lambda f: pbar.update(1))
+
+            medline_count = medline_future.result()
+            cdc_count = cdc_future.result()
+
     total = medline_count + cdc_count
-    print(f"✅ Total sources scraped: {total}\n")
+    print(f"✅ Sources scraped: {medline_count} MedlinePlus + {cdc_count} CDC = {total}\n")
     
     return total > 0
 
-def run_processing():
-    """Step 2: Process and clean scraped data"""
-    print("\n" + "="*70)
-    print("STEP 2: DATA PROCESSING")
-    print("="*70 + "\n")
-    
-    processor = TextProcessor()
-    documents = processor.process_all()
-    
-    if documents:
-        print(f"✅ Successfully processed {len(documents)} document chunks\n")
-        return documents
-    else:
-        print("❌ No documents were processed\n")
-        return []
+def batched(iterable, size):
+    """Yield lists of up to `size` items from any iterable"""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
-def build_database(documents):
-    """Step 3: Build vector database"""
-    print("\n" + "="*70)
-    print("STEP 3: BUILDING VECTOR DATABASE")
-    print("="*70 + "\n")
+def run_process_and_index(batch_size=256):
+    """Steps 2-3: Process scraped data and stream it into the vector database
     
-    if not documents:
-        print("❌ No documents to add to database")
-        return False
+    Returns the populated FreeVectorDB, or None if nothing was indexed.
+    """
+    print(INDEX_BANNER)
     
     print("🗄️ Initializing vector database...")
     vector_db = FreeVectorDB()
     
-    print("📊 Adding documents to database...")
-    vector_db.add_documents(documents)
+    # Chunks are embedded and inserted while later files are still being
+    # cleaned, so only one batch is ever held in memory. The same batches are
+    # streamed into all_documents.json (same layout as TextProcessor.process_all),
+    # written aside and swapped in only once something was processed
+    processor = TextProcessor()
+    output_file = processor.processed_dir / "all_documents.json"
+    partial_file = output_file.with_suffix(".json.partial")
+    total = 0
+    with open(partial_file, 'w', encoding='utf-8') as out, \
+            tqdm(desc="embed+index", unit="chunk") as pbar:
+        out.write("[")
+        for batch in batched(processor.iter_chunks(show_progress=False), batch_size):
+            vector_db.add_documents(batch, start_index=total, show_progress=False)
+            for doc in batch:
+                out.write(",\n  " if total else "\n  ")
+                out.write(json.dumps(doc, indent=2, ensure_ascii=False).replace("\n", "\n  "))
+                total += 1
+            pbar.update(len(batch))
+        out.write("\n]" if total else "]")
+    
+    if not total:
+        partial_file.unlink()
+        print("❌ No documents were processed\n")
+        return None
+    
+    partial_file.replace(output_file)
+    print(f"✅ Successfully processed {total} document chunks")
+    print(f"💾 Saved to: {output_file}\n")
     
     stats = vector_db.get_stats()
     print(f"\n✅ Database built successfully!")
     print(f"   📚 Total documents: {stats['total_documents']}")
     print(f"   🔢 Embedding dimensions: {stats['embedding_dimension']}\n")
     
-    return True
+    return vector_db
 
-def test_system():
+def test_system(vector_db=None):
     """Step 4: Test the RAG system"""
-    print("\n" + "="*70)
-    print("STEP 4: SYSTEM TEST")
-    print("="*70 + "\n")
+    print(TEST_BANNER)
     
     try:
         from src.rag.rag_pipeline import HealthCompassRAG
         
         print("🧪 Initializing RAG system...")
-        rag = HealthCompassRAG()
+        rag = HealthCompassRAG(vector_db=vector_db)
+        
+        # Pay the first-inference setup cost up front so the timing below
+        # reflects a real query
+        rag.vector_db.warmup()
         
         print("🔍 Running test query: 'What is diabetes?'\n")
+        start = time.perf_counter()
         result = rag.query("What is diabetes?", n_results=3)
+        elapsed = time.perf_counter() - start
         
-        print("✅ Test query successful!")
+        print(f"✅ Test query successful! ({elapsed:.2f}s)")
         print(f"\nAnswer preview:")
         print(f"{result['answer'][:200]}...\n")
         
@@ -145,10 +247,15 @@ def main():
     print("  - 100 (good coverage, ~15-20 minutes)")
     print("  - 200 (comprehensive, ~30-40 minutes)")
     
+    # Only bad or missing input (closed or piped stdin) falls back to the
+    # default; Ctrl-C still reaches the interrupt handler below
     try:
         limit_input = input("\nEnter number (default 50): ").strip()
         limit = int(limit_input) if limit_input else 50
-    except:
+        if not 1 <= limit <= 10000:
+            raise ValueError(limit)
+    except (ValueError, EOFError):
+        print("⚠️ Invalid input, using 50")
         limit = 50
     
     print(f"\n✅ Will scrape {limit} sources from each website\n")
@@ -158,35 +265,26 @@ def main():
         print("❌ Data collection failed. Exiting.")
         return
     
-    # Step 2: Process data
-    documents = run_processing()
-    if not documents:
+    # Steps 2-3: Process data and build database
+    vector_db = run_process_and_index()
+    if vector_db is None:
         print("❌ Data processing failed. Exiting.")
         return
     
-    # Step 3: Build database
-    if not build_database(documents):
-        print("❌ Database creation failed. Exiting.")
-        return
-    
-    # Step 4: Test system
-    test_system()
+    # Step 4: Test system, reusing the database and model already in memory
+    test_system(vector_db)
     
     # Success!
-    print("\n" + "="*70)
-    print("✅ SETUP COMPLETE!")
-    print("="*70)
-    print("\nYou can now run the Health Compass app:")
-    print("   streamlit run src/app.py")
-    print("\nOr test the RAG system:")
-    print("   python -m src.rag.rag_pipeline")
-    print("\n" + "="*70 + "\n")
+    print(COMPLETE_BANNER)
 
 if __name__ == "__main__":
+    sys.stdout = QueuedStdout(sys.stdout)
     try:
         main()
     except KeyboardInterrupt:
         print("\n\n⚠️ Pipeline interrupted by user")
     except Exception as e:
         print(f"\n\n❌ Error: {e}")
-        print("\nPlease check the error and try again.")
\ No newline at end of file
+        print("\nPlease check the error and try again.")
+    finally:
+        sys.stdout.flush()
\ No newline at end of file
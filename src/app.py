@@ -1,13 +1,11 @@
+import gc
+import re
 import streamlit as st
 import sys
+import threading
+import uuid
 from pathlib import Path
 from datetime import datetime, timedelta
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
-from PIL import Image
-import base64
-import io
 
 # Debug: Print to confirm app is loading
 print("✅ App starting - imports successful")
@@ -20,618 +18,369 @@ if str(project_root) not in sys.path:
 print("✅ Path configuration complete")
 
 from src.rag.rag_pipeline import HealthCompassRAG
+from src.rag.query_cache import QueryCache
 from src.utils.symptom_tracker import SymptomTracker
 from src.utils.healthcare_assistant import HealthcareAssistant
 from src.utils.document_analyzer_enhanced import EnhancedDocumentAnalyzer
 from src.utils.specialist_matcher import SpecialistMatcher
 from src.utils.user_profile import UserProfile
+from src.utils.tokens import truncate_to_tokens
+from src.utils.cache import content_hash
+from src.utils.llm_cache import cached_stream
 
 print("✅ Custom modules imported")
 
+# Display labels for the Dashboard, built once per process
+_LIFESTYLE_MAP = {
+    'smoking': {'never': '✅ Non-smoker', 'former': '⚠️ Former smoker', 'current': '🚫 Current smoker'},
+    'exercise': {'sedentary': '😴 Sedentary', 'light': '🚶 Light activity', 'moderate': '🏃 Moderate activity', 'active': '💪 Very active'},
+    'alcohol': {'none': '✅ No alcohol', 'occasional': '🍷 Occasional', 'moderate': '⚠️ Moderate', 'heavy': '🚫 Heavy use'}
+}
+_RISK_EMOJI = {'Low': '🟢', 'Moderate': '🟡', 'High': '🔴'}
+# Symptom severity (0-10) -> history icon; anything else gets _UNKNOWN_SEVERITY_ICON
+_SEVERITY_ICON = dict(enumerate(('🟢',) * 4 + ('🟡',) * 3 + ('🔴',) * 4))
+_UNKNOWN_SEVERITY_ICON = '⚪'
+
+# Sequence markers some models leak into their replies
+_LLM_SENTINEL_RE = re.compile(r"</?s>")
+
+# Shown when the model streams back nothing
+_EMPTY_REPLY = "⚠️ No response was generated. Please try asking again."
+
+# Chat turns drawn as individual bubbles; anything older is drawn as one block
+_CHAT_BUBBLES = 10
+# Chat turns kept in session memory; older ones are archived to disk
+_CHAT_HISTORY_LIMIT = 30
+
+# Stored value -> selectbox position for the profile editor
+_GENDERS = ["Male", "Female", "Other"]
+_GENDER_IDX = {g: i for i, g in enumerate(_GENDERS)}
+_BLOOD_TYPES = ["Unknown", "A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"]
+_BLOOD_IDX = {b: i for i, b in enumerate(_BLOOD_TYPES)}
+_SMOKE_IDX = {"never": 0, "former": 1, "current": 2}
+_ALCOHOL_IDX = {"none": 0, "occasional": 1, "moderate": 2, "heavy": 3}
+_EXERCISE_IDX = {"sedentary": 0, "light": 1, "moderate": 2, "active": 3}
+_DIET_IDX = {"balanced": 0, "vegetarian": 1, "vegan": 2, "other": 3}
+_PATIENT_GENDER_IDX = {"Male": 1, "Female": 2}  # after "Not specified"
+
+# Doc Analyzer options: stable key -> radio label
+_ANALYSES = {
+    'lab': "🔬 Comprehensive Lab Analysis",
+    'explain': "📋 Explain All Results",
+    'abnormal': "⚠️ Highlight Abnormal Values Only",
+    'questions': "❓ Generate Questions for Doctor",
+    'medication': "💊 Medication Review"
+}
+
+# HTML blocks, built once and filled with str.format at render time
+ONBOARDING_HERO_HTML = """
+<div class='onboarding-container'>
+    <div class='onboarding-hero'>
+        <h1>👋 Welcome to Health Compass!</h1>
+        <p>Let's set up your personalized health profile in just a few steps</p>
+    </div>
+</div>
+"""
+APP_HEADER_TMPL = """
+<div class='app-header'>
+    <h1>🏥 {header}</h1>
+    <p>{tagline}</p>
+</div>
+"""
+INFO_CARD_TMPL = """
+<div class='info-card'>
+    {body}
+</div>
+"""
+SOURCE_CARD_TMPL = """
+<div class='source-card'>
+    <strong>{i}. {source}</strong><br>
+    <span style='color: #64748b;'>{title}</span><br>
+    <a href="{url}" target="_blank">🔗 Read Full Article →</a>
+</div>
+"""
+SPECIALIST_CARD_TMPL = """
+<div class='info-card'>
+    <h3>{icon} {name}</h3>
+    <p><strong>Confidence:</strong> {confidence:.0f}%</p>
+    <p><strong>Specializes in:</strong> {treats}</p>
+</div>
+"""
+FOOTER_HTML = """
+<div class='app-footer'>
+    <h3>🏥 Health Compass</h3>
+    <p style='font-size: 1.1rem; font-weight: 600; color: #0891b2;'>Your AI-Powered Medical Companion</p>
+    <p style='margin-top: 1rem;'>📚 Educational Information Only • Not Medical Advice</p>
+    <p style='color: #94a3b8; font-size: 0.9rem; margin-top: 1.5rem;'>
+        INFO 7390 Advanced Data Science & Architecture<br>
+        Final Project by <strong>Manish Kumar</strong><br>
+        Northeastern University • Khoury College of Computer Sciences
+    </p>
+</div>
+"""
+
+# UI strings per language, and each language's header rendered up front
+_TRANSLATIONS = {
+    'English': {'header': 'Health Compass', 'tagline': 'Your AI-Powered Medical Assistant',
+               'search_placeholder': 'Ask any health question...', 'search_btn': 'Search',
+               'emergency': 'Emergency', 'call_911': 'Call 911 Immediately'},
+    'Spanish': {'header': 'Brújula de Salud', 'tagline': 'Asistente Médico con IA',
+               'search_placeholder': 'Pregunta de salud...', 'search_btn': 'Buscar',
+               'emergency': 'Emergencia', 'call_911': 'Llamar 911'},
+    'Chinese': {'header': '健康指南针', 'tagline': 'AI医疗助手',
+               'search_placeholder': '健康问题...', 'search_btn': '搜索',
+               'emergency': '紧急', 'call_911': '911'},
+    'French': {'header': 'Boussole Santé', 'tagline': 'Assistant Médical IA',
+              'search_placeholder': 'Question santé...', 'search_btn': 'Rechercher',
+              'emergency': 'Urgence', 'call_911': 'Appeler 911'}
+}
+_HEADER_HTML = {
+    lang: APP_HEADER_TMPL.format(header=t['header'], tagline=t['tagline'])
+    for lang, t in _TRANSLATIONS.items()
+}
+_LANGS = tuple(_TRANSLATIONS)
+
+# Main app sections: key -> navigation label
+_SECTIONS = {
+    'dash': "🏠 Dashboard",
+    'qa': "🔍 Medical Q&A",
+    'doc': "📄 Doc Analyzer",
+    'symptom': "📊 Symptom Tracker",
+    'ai': "💬 AI Assistant"
+}
+_LANG_IDX = {lang: i for i, lang in enumerate(_LANGS)}
+
 # Initialize user profile
 try:
+    # Guarded rather than setdefault() so the profile file is only read once
     if 'user_profile' not in st.session_state:
         st.session_state.user_profile = UserProfile()
     
-    # Better onboarding detection
+    # Onboarding is decided once per session from the in-memory profile
     if 'show_onboarding' not in st.session_state:
-        try:
-            profile_data = st.session_state.user_profile.get_basic_info()
-            has_valid_profile = (
-                profile_data.get('name') and 
-                profile_data.get('name') != '' and
-                profile_data.get('age') and
-                profile_data.get('age') > 0
-            )
-            st.session_state.show_onboarding = not has_valid_profile
-        except Exception as e:
-            # If profile check fails, show onboarding
-            st.session_state.show_onboarding = True
+        st.session_state.show_onboarding = st.session_state.user_profile.needs_onboarding()
 except Exception as e:
     st.error(f"Error initializing profile: {e}")
     st.stop()
 
 # Initialize session state
-if 'language' not in st.session_state:
-    st.session_state.language = 'English'
-if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
+st.session_state.setdefault('language', 'English')
+st.session_state.setdefault('chat_history', [])
+st.session_state.setdefault('chat_session_id', uuid.uuid4().hex)
+st.session_state.setdefault('chat_archived', 0)
 
 print("✅ Session state initialized")
 
 # Load RAG
 @st.cache_resource(show_spinner=False)
+def _build_rag():
+    print("🔄 Loading RAG system...")
+    return HealthCompassRAG()
+
 def load_rag():
+    """Shared RAG system, or None if it failed to load
+    
+    Failures raise out of the cached builder, so they are not memoized and
+    the next rerun retries (e.g. once the embedding model has downloaded).
+    Whatever a failed attempt put on the GPU is released first, so retries
+    do not stack partial model loads until they run out of memory.
+    """
     try:
-        print("🔄 Loading RAG system...")
-        return HealthCompassRAG()
+        rag = _build_rag()
     except Exception as e:
         print(f"❌ RAG loading failed: {e}")
+        st.session_state.rag_error = str(e)
+        release_gpu_memory()
         return None
+    st.session_state.pop('rag_error', None)
+    return rag
+
+def release_gpu_memory():
+    """Return cached CUDA blocks to the driver (no-op without torch/CUDA)"""
+    try:
+        import torch
+    except ImportError:
+        return
+    if torch.cuda.is_available():
+        gc.collect()  # drop the failed attempt's tensors before emptying
+        torch.cuda.empty_cache()
 
 print("✅ RAG loader defined")
 
+# Stateless helpers built once per server instead of on every rerun; keyed
+# on the RAG object's id so they are rebuilt if the RAG system comes online
+@st.cache_resource(show_spinner=False)
+def get_analyzer(_rag_system, rag_id):
+    return EnhancedDocumentAnalyzer(rag_system=_rag_system)
+
+@st.cache_resource(show_spinner=False)
+def get_specialist_matcher(_rag_system, rag_id):
+    return SpecialistMatcher(rag_system=_rag_system)
+
+@st.cache_resource(show_spinner=False)
+def get_symptom_tracker():
+    return SymptomTracker()
+
+@st.cache_resource(show_spinner=False)
+def get_assistant():
+    return HealthcareAssistant()
+
+# Pay first-use costs (ONNX/torch kernels, Chroma index pages, the LLM's TLS
+# connection) once per server in the background while the user looks around
+@st.cache_resource(show_spinner=False)
+def start_warmup(_rag_system, rag_id):
+    """Start warming the RAG system; the returned event is set when done"""
+    done = threading.Event()
+    
+    def warm():
+        try:
+            _rag_system.vector_db.warmup()
+            _rag_system.vector_db.search("warmup", n_results=1)
+            _rag_system.llm.generate([{"role": "user", "content": "hi"}], max_tokens=1)
+        except Exception as e:
+            print(f"⚠️ Warmup failed: {e}")
+        finally:
+            done.set()
+    
+    threading.Thread(target=warm, daemon=True).start()
+    return done
+
+def stream_text(streamed):
+    """st.write_stream's return value as a str
+    
+    write_stream returns a list rather than a str when the stream produced
+    no non-empty text, e.g. an empty reply or one filtered down to nothing.
+    """
+    if isinstance(streamed, str):
+        return streamed
+    return "".join(map(str, streamed))
+
+# Answers shared across sessions, so repeat and near-duplicate questions skip
+# retrieval and the LLM; one cache per result count
+@st.cache_resource(show_spinner=False)
+def get_query_cache(n_results):
+    return QueryCache()
+
+# Retrieved passages for chat turns, shared the same way, so a follow-up that
+# repeats or rephrases an earlier question skips the vector search
+@st.cache_resource(show_spinner=False)
+def get_retrieval_cache(n_results):
+    return QueryCache()
+
+def lookup_query_cache(rag, cache, query):
+    """Exact, then semantic lookup of query in one of the caches above
+    
+    Returns (result, key, embedding). The embedding is None for emergencies,
+    which are never served from a near-match nor stored; on a miss callers
+    hand it to the search so the query is only encoded once.
+    """
+    # Let a still-running warmup finish rather than compete with it
+    start_warmup(rag, id(rag)).wait(timeout=5)
+    
+    key = QueryCache.normalize(query)
+    result = cache.get(key)
+    if result is not None:
+        return result, key, None
+    
+    if rag.safety.check_query(query)['level'] == 'EMERGENCY':
+        return None, key, None
+    
+    embedding = rag.vector_db.embed_texts([query])[0]
+    return cache.get_similar(embedding), key, embedding
+
+def cached_rag_query(rag, query, n_results=5, answer_slot=None):
+    """rag.query() behind the exact + semantic query cache
+    
+    With an answer_slot (an st.empty placeholder), a freshly generated answer
+    is streamed into it as it arrives rather than returned all at once.
+    """
+    cache = get_query_cache(n_results)
+    result, key, embedding = lookup_query_cache(rag, cache, query)
+    if result is not None:
+        return result
+    
+    if answer_slot is None:
+        result = rag.query(query, n_results=n_results, query_embedding=embedding)
+    else:
+        with answer_slot, st.spinner("🔎 Searching medical databases..."):
+            result = rag.retrieve(query, n_results=n_results, query_embedding=embedding)
+        messages = result.pop('messages', None)
+        if messages:
+            with answer_slot:
+                result['answer'] = stream_text(st.write_stream(cached_stream(
+                    rag.llm, messages,
+                    temperature=rag.ANSWER_TEMPERATURE,
+                    max_tokens=rag.ANSWER_MAX_TOKENS
+                )))
+    
+    # A failed or empty LLM reply is retried next time rather than replayed
+    if not result['answer'].strip():
+        result['answer'] = _EMPTY_REPLY
+        return result
+    if embedding is not None and not result['answer'].startswith("❌"):
+        cache.put(key, embedding, result)
+    return result
+
+def cached_rag_retrieve(rag, query, n_results=3):
+    """rag.retrieve() behind the exact + semantic retrieval cache"""
+    cache = get_retrieval_cache(n_results)
+    result, key, embedding = lookup_query_cache(rag, cache, query)
+    if result is not None:
+        return result
+    
+    result = rag.retrieve(query, n_results=n_results, query_embedding=embedding)
+    result.pop('messages', None)  # only the passages are reused
+    if embedding is not None:
+        cache.put(key, embedding, result)
+    return result
+
+# Document count for the sidebar; refreshed at most once a minute instead of
+# querying Chroma on every click
+@st.cache_data(ttl=60, show_spinner=False)
+def get_vector_stats():
+    rag = load_rag()
+    return rag.vector_db.get_stats() if rag else None
+
+# Profile summary (BMI, lifestyle risk) is recomputed only when the profile is
+# saved; the version is the profile's last-saved timestamp. Neither depends
+# on the clock, so no TTL; only a couple of recent versions are kept
+@st.cache_data(max_entries=4, show_spinner=False)
+def get_profile_summary(_profile, profile_version):
+    return _profile.get_profile_summary()
+
+# Patient context for chat prompts, rebuilt on the same profile-save key
+@st.cache_data(max_entries=4, show_spinner=False)
+def get_profile_context(_profile, profile_version):
+    return _profile.get_context_for_ai()
+
+# Document analysis keyed on a digest of the uploaded bytes, so analyzing the
+# same file again (or re-uploading it) skips OCR, parsing and the reference
+# lookups; the upload itself is passed unhashed and read in place
+@st.cache_data(max_entries=8, show_spinner=False)
+def analyze_upload(_analyzer, rag_id, digest, _data, file_type, gender):
+    return _analyzer.analyze_document(_data, file_type, gender)
+
 # ==================== MODERN UI STYLES ====================
+@st.cache_data(show_spinner=False)
+def load_css():
+    """Read and minify the app stylesheet once per process"""
+    return minify_css((Path(__file__).parent / "static" / "app.css").read_text(encoding="utf-8"))
+
+_CSS_STRING_RE = re.compile(r"""("[^"]*"|'[^']*')""")
+
+def minify_css(css):
+    """Drop comments and redundant whitespace, leaving quoted strings as-is"""
+    parts = _CSS_STRING_RE.split(re.sub(r"/\*.*?\*/", "", css, flags=re.S))
+    for i in range(0, len(parts), 2):  # even slots are outside quotes
+        code = re.sub(r"\s+", " ", parts[i])
+        code = re.sub(r"\s*([{};,>])\s*", r"\1", code)
+        parts[i] = re.sub(r":\s+", ":", code).replace(";}", "}")
+    return "".join(parts).strip()
+
 def inject_modern_styles():
-    st.markdown("""
-    <style>
-        /* Import Fonts */
-        @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;500;600;700;800;900&family=Inter:wght@300;400;500;600;700&display=swap');
-        
-        /* Global Resets & Base */
-        * {
-            font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        }
-        
-        h1, h2, h3, h4, h5, h6 {
-            font-family: 'Poppins', sans-serif !important;
-            font-weight: 700 !important;
-            letter-spacing: -0.02em !important;
-        }
-        
-        /* App Background with Pattern */
-        .stApp {
-            background: linear-gradient(135deg, #f0fdfa 0%, #ecfeff 50%, #f0f9ff 100%);
-            background-attachment: fixed;
-        }
-        
-        .stApp::before {
-            content: '';
-            position: fixed;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background-image: 
-                radial-gradient(circle at 20% 50%, rgba(6, 182, 212, 0.03) 0%, transparent 50%),
-                radial-gradient(circle at 80% 80%, rgba(20, 184, 166, 0.03) 0%, transparent 50%);
-            pointer-events: none;
-            z-index: 0;
-        }
-        
-        /* Hide Streamlit Branding */
-        #MainMenu, footer, header {visibility: hidden;}
-        
-        /* ==================== ONBOARDING STYLES ==================== */
-        .onboarding-container {
-            max-width: 900px;
-            margin: 0 auto;
-            padding: 2rem 1rem;
-        }
-        
-        .onboarding-hero {
-            background: linear-gradient(135deg, #06b6d4 0%, #0891b2 50%, #0e7490 100%);
-            padding: 4rem 3rem;
-            border-radius: 32px;
-            text-align: center;
-            margin-bottom: 3rem;
-            box-shadow: 
-                0 20px 60px rgba(6, 182, 212, 0.3),
-                0 0 0 1px rgba(255, 255, 255, 0.1) inset;
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .onboarding-hero::before {
-            content: '';
-            position: absolute;
-            top: -50%;
-            right: -50%;
-            width: 200%;
-            height: 200%;
-            background: radial-gradient(circle, rgba(255,255,255,0.1) 0%, transparent 70%);
-            animation: pulse 4s ease-in-out infinite;
-        }
-        
-        @keyframes pulse {
-            0%, 100% { transform: scale(1); opacity: 0.5; }
-            50% { transform: scale(1.1); opacity: 0.8; }
-        }
-        
-        .onboarding-hero h1 {
-            color: white !important;
-            font-size: 3.5rem !important;
-            font-weight: 900 !important;
-            margin: 0 0 1rem 0 !important;
-            text-shadow: 0 4px 20px rgba(0, 0, 0, 0.2);
-            position: relative;
-            z-index: 1;
-        }
-        
-        .onboarding-hero p {
-            color: rgba(255, 255, 255, 0.95) !important;
-            font-size: 1.4rem !important;
-            font-weight: 400 !important;
-            margin: 0 !important;
-            position: relative;
-            z-index: 1;
-        }
-        
-        .step-card {
-            background: white;
-            padding: 3rem;
-            border-radius: 24px;
-            box-shadow: 
-                0 10px 40px rgba(0, 0, 0, 0.08),
-                0 0 0 1px rgba(0, 0, 0, 0.03);
-            margin: 2rem 0;
-            border: 1px solid rgba(6, 182, 212, 0.1);
-            animation: slideUp 0.5s ease-out;
-        }
-        
-        @keyframes slideUp {
-            from {
-                opacity: 0;
-                transform: translateY(20px);
-            }
-            to {
-                opacity: 1;
-                transform: translateY(0);
-            }
-        }
-        
-        .step-card h2 {
-            color: #0e7490 !important;
-            font-size: 2rem !important;
-            margin-bottom: 2rem !important;
-        }
-        
-        /* Progress Bar Enhancement */
-        .stProgress > div > div > div {
-            background: linear-gradient(90deg, #06b6d4 0%, #14b8a6 100%);
-            border-radius: 10px;
-            height: 8px;
-        }
-        
-        /* ==================== MAIN APP STYLES ==================== */
-        
-        /* Header */
-        .app-header {
-            background: linear-gradient(135deg, #06b6d4 0%, #0891b2 50%, #14b8a6 100%);
-            padding: 3rem 3rem 4rem 3rem;
-            margin: -4rem -4rem 3rem -4rem;
-            border-radius: 0 0 40px 40px;
-            box-shadow: 
-                0 20px 60px rgba(6, 182, 212, 0.25),
-                0 0 0 1px rgba(255, 255, 255, 0.1) inset;
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .app-header::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: url("data:image/svg+xml,%3Csvg width='60' height='60' viewBox='0 0 60 60' xmlns='http://www.w3.org/2000/svg'%3E%3Cg fill='none' fill-rule='evenodd'%3E%3Cg fill='%23ffffff' fill-opacity='0.05'%3E%3Cpath d='M36 34v-4h-2v4h-4v2h4v4h2v-4h4v-2h-4zm0-30V0h-2v4h-4v2h4v4h2V6h4V4h-4zM6 34v-4H4v4H0v2h4v4h2v-4h4v-2H6zM6 4V0H4v4H0v2h4v4h2V6h4V4H6z'/%3E%3C/g%3E%3C/g%3E%3C/svg%3E");
-            opacity: 0.4;
-        }
-        
-        .app-header h1 {
-            color: white !important;
-            font-size: 3rem !important;
-            font-weight: 900 !important;
-            margin: 0 0 0.5rem 0 !important;
-            text-shadow: 0 4px 20px rgba(0, 0, 0, 0.15);
-            position: relative;
-            z-index: 1;
-        }
-        
-        .app-header p {
-            color: rgba(255, 255, 255, 0.95) !important;
-            font-size: 1.3rem !important;
-            font-weight: 500 !important;
-            margin: 0 !important;
-            position: relative;
-            z-index: 1;
-        }
-        
-        /* Sidebar Styling */
-        [data-testid="stSidebar"] {
-            background: linear-gradient(180deg, #0f172a 0%, #1e293b 100%);
-            border-right: 1px solid rgba(6, 182, 212, 0.2);
-        }
-        
-        [data-testid="stSidebar"] * {
-            color: rgba(255, 255, 255, 0.9) !important;
-        }
-        
-        [data-testid="stSidebar"] h2 {
-            color: white !important;
-            font-weight: 700 !important;
-            font-size: 1.4rem !important;
-            margin: 1.5rem 0 1rem 0 !important;
-        }
-        
-        [data-testid="stSidebar"] hr {
-            border-color: rgba(255, 255, 255, 0.1) !important;
-            margin: 1.5rem 0 !important;
-        }
-        
-        [data-testid="stSidebar"] .stButton > button {
-            background: rgba(6, 182, 212, 0.15) !important;
-            border: 1px solid rgba(6, 182, 212, 0.3) !important;
-            color: white !important;
-        }
-        
-        [data-testid="stSidebar"] .stButton > button:hover {
-            background: rgba(6, 182, 212, 0.25) !important;
-            border-color: rgba(6, 182, 212, 0.5) !important;
-            transform: translateY(-2px);
-        }
-        
-        /* Form Elements */
-        .stTextInput input, .stTextArea textarea, .stNumberInput input {
-            background: white !important;
-            border: 2px solid #e2e8f0 !important;
-            border-radius: 16px !important;
-            padding: 1rem !important;
-            font-size: 1rem !important;
-            color: #0f172a !important;
-            transition: all 0.3s ease !important;
-        }
-        
-        .stTextInput input:focus, .stTextArea textarea:focus, .stNumberInput input:focus {
-            border-color: #06b6d4 !important;
-            box-shadow: 0 0 0 3px rgba(6, 182, 212, 0.1) !important;
-            transform: translateY(-2px);
-        }
-        
-        .stTextInput label, .stTextArea label, .stNumberInput label, .stSelectbox label {
-            color: #0f172a !important;
-            font-weight: 600 !important;
-            font-size: 0.95rem !important;
-            margin-bottom: 0.5rem !important;
-        }
-        
-        /* Select Boxes */
-        .stSelectbox > div > div, [data-baseweb="select"], [data-baseweb="select"] > div {
-            background: white !important;
-            border: 2px solid #e2e8f0 !important;
-            border-radius: 16px !important;
-            color: #0f172a !important;
-        }
-        
-        [data-baseweb="select"]:hover {
-            border-color: #06b6d4 !important;
-        }
-        
-        [role="listbox"] {
-            background: white !important;
-            border: 2px solid #e2e8f0 !important;
-            border-radius: 16px !important;
-            box-shadow: 0 20px 60px rgba(0, 0, 0, 0.15) !important;
-        }
-        
-        [role="option"] {
-            background: white !important;
-            color: #0f172a !important;
-            padding: 0.75rem 1rem !important;
-            transition: all 0.2s ease !important;
-        }
-        
-        [role="option"]:hover {
-            background: linear-gradient(90deg, #ecfeff 0%, #f0fdfa 100%) !important;
-            color: #0e7490 !important;
-            transform: translateX(4px);
-        }
-        
-        /* Buttons */
-        .stButton > button {
-            background: linear-gradient(135deg, #06b6d4 0%, #0891b2 100%) !important;
-            color: white !important;
-            border: none !important;
-            border-radius: 16px !important;
-            padding: 0.9rem 2.5rem !important;
-            font-weight: 600 !important;
-            font-size: 1.05rem !important;
-            box-shadow: 
-                0 10px 30px rgba(6, 182, 212, 0.3),
-                0 0 0 1px rgba(255, 255, 255, 0.1) inset !important;
-            cursor: pointer !important;
-            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
-        }
-        
-        .stButton > button:hover {
-            background: linear-gradient(135deg, #0891b2 0%, #0e7490 100%) !important;
-            transform: translateY(-3px) !important;
-            box-shadow: 
-                0 15px 40px rgba(6, 182, 212, 0.4),
-                0 0 0 1px rgba(255, 255, 255, 0.2) inset !important;
-        }
-        
-        .stButton > button:active {
-            transform: translateY(-1px) !important;
-        }
-        
-        /* Tabs */
-        .stTabs [data-baseweb="tab-list"] {
-            background: white;
-            padding: 0.8rem 1rem;
-            border-radius: 20px;
-            box-shadow: 0 4px 20px rgba(0, 0, 0, 0.06);
-            margin-bottom: 2.5rem;
-            gap: 0.5rem;
-        }
-        
-        .stTabs [data-baseweb="tab"] {
-            color: #64748b !important;
-            font-weight: 600 !important;
-            font-size: 1rem !important;
-            padding: 0.9rem 2rem !important;
-            border-radius: 14px !important;
-            transition: all 0.3s ease !important;
-        }
-        
-        .stTabs [data-baseweb="tab"]:hover {
-            background: #f8fafc !important;
-            color: #0891b2 !important;
-        }
-        
-        .stTabs [aria-selected="true"] {
-            background: linear-gradient(135deg, #06b6d4 0%, #0891b2 100%) !important;
-            color: white !important;
-            box-shadow: 0 4px 12px rgba(6, 182, 212, 0.3) !important;
-        }
-        
-        /* Metrics */
-        [data-testid="stMetric"] {
-            background: white;
-            border-radius: 20px;
-            padding: 2rem 1.5rem;
-            box-shadow: 
-                0 8px 32px rgba(0, 0, 0, 0.06),
-                0 0 0 1px rgba(0, 0, 0, 0.02);
-            border: 1px solid rgba(6, 182, 212, 0.08);
-            transition: all 0.3s ease;
-        }
-        
-        [data-testid="stMetric"]:hover {
-            transform: translateY(-4px);
-            box-shadow: 
-                0 12px 40px rgba(0, 0, 0, 0.1),
-                0 0 0 1px rgba(6, 182, 212, 0.15);
-        }
-        
-        [data-testid="stMetricLabel"] {
-            color: #64748b !important;
-            font-weight: 600 !important;
-            font-size: 0.9rem !important;
-            text-transform: uppercase;
-            letter-spacing: 0.05em;
-        }
-        
-        [data-testid="stMetricValue"] {
-            color: #0891b2 !important;
-            font-size: 2.5rem !important;
-            font-weight: 800 !important;
-            font-family: 'Poppins', sans-serif !important;
-        }
-        
-        /* Expanders */
-        .streamlit-expanderHeader {
-            background: white !important;
-            border-radius: 16px !important;
-            padding: 1.2rem 1.5rem !important;
-            font-weight: 600 !important;
-            color: #0f172a !important;
-            border: 1px solid #e2e8f0 !important;
-            transition: all 0.3s ease !important;
-        }
-        
-        .streamlit-expanderHeader:hover {
-            background: #f8fafc !important;
-            border-color: #06b6d4 !important;
-            transform: translateX(4px);
-        }
-        
-        .streamlit-expanderContent {
-            background: white !important;
-            border: 1px solid #e2e8f0 !important;
-            border-top: none !important;
-            border-radius: 0 0 16px 16px !important;
-            padding: 1.5rem !important;
-        }
-        
-        /* Source Cards */
-        .source-card {
-            background: linear-gradient(135deg, #ecfeff 0%, #f0fdfa 100%);
-            border: 1px solid #a5f3fc;
-            border-left: 5px solid #06b6d4;
-            border-radius: 16px;
-            padding: 1.8rem;
-            margin: 1.2rem 0;
-            box-shadow: 0 4px 12px rgba(6, 182, 212, 0.1);
-            transition: all 0.3s ease;
-        }
-        
-        .source-card:hover {
-            transform: translateX(8px);
-            box-shadow: 0 8px 24px rgba(6, 182, 212, 0.2);
-            border-left-width: 8px;
-        }
-        
-        .source-card strong {
-            color: #0e7490 !important;
-            font-size: 1.1rem;
-            display: block;
-            margin-bottom: 0.5rem;
-        }
-        
-        .source-card a {
-            color: #06b6d4 !important;
-            font-weight: 600;
-            text-decoration: none;
-            transition: all 0.2s ease;
-        }
-        
-        .source-card a:hover {
-            color: #0891b2 !important;
-            text-decoration: underline;
-        }
-        
-        /* Chat Messages */
-        .stChatMessage {
-            background: white !important;
-            border-radius: 20px !important;
-            padding: 1.5rem !important;
-            margin: 1rem 0 !important;
-            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.06) !important;
-            border: 1px solid rgba(0, 0, 0, 0.03) !important;
-        }
-        
-        /* File Uploader */
-        [data-testid="stFileUploader"] {
-            background: white;
-            border: 2px dashed #cbd5e1;
-            border-radius: 20px;
-            padding: 2rem;
-            transition: all 0.3s ease;
-        }
-        
-        [data-testid="stFileUploader"]:hover {
-            border-color: #06b6d4;
-            background: #f0fdfa;
-        }
-        
-        /* Alerts */
-        .stAlert {
-            border-radius: 16px !important;
-            border-left-width: 5px !important;
-            padding: 1.2rem 1.5rem !important;
-        }
-        
-        /* Radio Buttons */
-        .stRadio > div {
-            background: white;
-            padding: 1rem;
-            border-radius: 16px;
-            border: 1px solid #e2e8f0;
-        }
-        
-        .stRadio label {
-            color: #0f172a !important;
-            font-weight: 500 !important;
-        }
-        
-        /* Slider */
-        .stSlider {
-            padding: 1rem 0;
-        }
-        
-        .stSlider [data-baseweb="slider"] {
-            margin-top: 1rem;
-        }
-        
-        /* Spinner */
-        .stSpinner > div {
-            border-top-color: #06b6d4 !important;
-        }
-        
-        /* Custom Cards */
-        .info-card {
-            background: white;
-            border-radius: 20px;
-            padding: 2rem;
-            box-shadow: 0 8px 32px rgba(0, 0, 0, 0.06);
-            border: 1px solid rgba(6, 182, 212, 0.1);
-            margin: 1.5rem 0;
-            transition: all 0.3s ease;
-        }
-        
-        .info-card:hover {
-            transform: translateY(-4px);
-            box-shadow: 0 12px 40px rgba(0, 0, 0, 0.1);
-        }
-        
-        .info-card h3 {
-            color: #0891b2 !important;
-            font-size: 1.5rem !important;
-            margin-bottom: 1rem !important;
-        }
-        
-        /* Footer */
-        .app-footer {
-            text-align: center;
-            padding: 3rem 2rem;
-            margin-top: 4rem;
-            background: white;
-            border-radius: 24px;
-            box-shadow: 0 -4px 20px rgba(0, 0, 0, 0.05);
-        }
-        
-        .app-footer h3 {
-            color: #0891b2 !important;
-            font-size: 1.8rem !important;
-            margin-bottom: 0.5rem !important;
-        }
-        
-        .app-footer p {
-            color: #64748b !important;
-            font-size: 1rem !important;
-        }
-        
-        /* Animations */
-        @keyframes fadeIn {
-            from {
-                opacity: 0;
-                transform: translateY(10px);
-            }
-            to {
-                opacity: 1;
-                transform: translateY(0);
-            }
-        }
-        
-        .animate-fade-in {
-            animation: fadeIn 0.5s ease-out;
-        }
-        
-        /* Scrollbar */
-        ::-webkit-scrollbar {
-            width: 12px;
-            height: 12px;
-        }
-        
-        ::-webkit-scrollbar-track {
-            background: #f1f5f9;
-            border-radius: 10px;
-        }
-        
-        ::-webkit-scrollbar-thumb {
-            background: linear-gradient(135deg, #06b6d4 0%, #0891b2 100%);
-            border-radius: 10px;
-            border: 2px solid #f1f5f9;
-        }
-        
-        ::-webkit-scrollbar-thumb:hover {
-            background: linear-gradient(135deg, #0891b2 0%, #0e7490 100%);
-        }
-    </style>
-    """, unsafe_allow_html=True)
+    # Streamlit drops elements not re-emitted on a rerun, so the <style> tag
+    # is sent every run; only the file read is cached
+    st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
 
 # ==================== ONBOARDING FLOW ====================
 if st.session_state.show_onboarding:
@@ -644,17 +393,9 @@ if st.session_state.show_onboarding:
     
     inject_modern_styles()
     
-    st.markdown("""
-    <div class='onboarding-container'>
-        <div class='onboarding-hero'>
-            <h1>👋 Welcome to Health Compass!</h1>
-            <p>Let's set up your personalized health profile in just a few steps</p>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(ONBOARDING_HERO_HTML, unsafe_allow_html=True)
     
-    if 'onboarding_step' not in st.session_state:
-        st.session_state.onboarding_step = 1
+    st.session_state.setdefault('onboarding_step', 1)
     
     profile = st.session_state.user_profile
     progress = st.session_state.onboarding_step / 4
@@ -718,14 +459,8 @@ if st.session_state.show_onboarding:
         with col_b2:
             if st.button("Continue →", use_container_width=True, type="primary"):
                 profile.update_health_info(height=height, weight=weight, blood_type=blood_type if blood_type != "Unknown" else None)
-                if allergies_input:
-                    for a in allergies_input.strip().split('\n'):
-                        if a.strip():
-                            profile.add_allergy(a.strip())
-                if conditions_input:
-                    for c in conditions_input.strip().split('\n'):
-                        if c.strip():
-                            profile.add_condition(c.strip())
+                profile.add_allergies(allergies_input.splitlines())
+                profile.add_conditions(conditions_input.splitlines())
                 st.session_state.onboarding_step = 3
                 st.rerun()
     
@@ -785,8 +520,6 @@ if st.session_state.show_onboarding:
                 st.session_state.language = language
                 st.balloons()
                 st.success("✅ Welcome to Health Compass! Your profile is ready.")
-                import time
-                time.sleep(1.5)
                 st.rerun()
 
 # ==================== MAIN APP ====================
@@ -801,58 +534,56 @@ else:
     
     inject_modern_styles()
     
-    translations = {
-        'English': {'header': 'Health Compass', 'tagline': 'Your AI-Powered Medical Assistant',
-                   'search_placeholder': 'Ask any health question...', 'search_btn': 'Search',
-                   'emergency': 'Emergency', 'call_911': 'Call 911 Immediately'},
-        'Spanish': {'header': 'Brújula de Salud', 'tagline': 'Asistente Médico con IA',
-                   'search_placeholder': 'Pregunta de salud...', 'search_btn': 'Buscar',
-                   'emergency': 'Emergencia', 'call_911': 'Llamar 911'},
-        'Chinese': {'header': '健康指南针', 'tagline': 'AI医疗助手',
-                   'search_placeholder': '健康问题...', 'search_btn': '搜索',
-                   'emergency': '紧急', 'call_911': '911'},
-        'French': {'header': 'Boussole Santé', 'tagline': 'Assistant Médical IA',
-                  'search_placeholder': 'Question santé...', 'search_btn': 'Rechercher',
-                  'emergency': 'Urgence', 'call_911': 'Appeler 911'}
-    }
-    t = translations[st.session_state.language]
+    # One profile handle and summary for the whole run; every section below
+    # reads these instead of going back through session_state
+    profile = st.session_state.user_profile
+    summary = get_profile_summary(profile, profile.version)
     
-    st.markdown(f"""
-    <div class='app-header'>
-        <h1>🏥 {t['header']}</h1>
-        <p>{t['tagline']}</p>
-    </div>
-    """, unsafe_allow_html=True)
+    # The one RAG handle for this run; sections and fragments take it from here
+    rag = load_rag()
+    if rag:
+        start_warmup(rag, id(rag))
     
-    # Sidebar
-    with st.sidebar:
-        profile = st.session_state.user_profile
-        summary = profile.get_profile_summary()
-        
+    t = _TRANSLATIONS[st.session_state.language]
+    
+    st.markdown(_HEADER_HTML[st.session_state.language], unsafe_allow_html=True)
+    
+    # Sections that rerun on their own when their widgets change, instead of
+    # rerunning the whole script; st.rerun() inside them is still app-wide
+    # unless called with scope="fragment"
+    @st.fragment
+    def render_sidebar_profile(profile, summary):
         st.markdown("## 👤 Profile")
         st.markdown(f"### {summary['name']}")
         st.caption(f"🎂 {summary['age']} years • {summary.get('gender', 'N/A')}")
         
         if summary['bmi']:
-            st.caption(f"📊 BMI: {summary['bmi']} ({summary['bmi_category']})")
+            st.caption(f"📊 BMI: {summary['bmi_color']} {summary['bmi']} ({summary['bmi_category']})")
         if summary['conditions_count'] > 0:
             st.caption(f"📋 {summary['conditions_count']} condition(s) tracked")
         
         if st.button("🔄 Create New Profile", use_container_width=True):
-            st.session_state.user_profile.reset_profile()
+            profile.reset_profile()
             st.session_state.show_onboarding = True
             st.session_state.chat_history = []
             st.rerun()
-        
+    
+    def set_language():
+        st.session_state.language = st.session_state.sidebar_lang
+    
+    # The language picker sits outside the fragments: the header and every
+    # translated label must redraw, so a switch is one plain full rerun, with
+    # the new language stored by the callback before that run starts
+    def render_language_picker():
         st.markdown("---")
         st.markdown("## 🌍 Language")
-        lang = st.selectbox("Choose Language", ["English", "Spanish", "Chinese", "French"], 
-                           index=["English", "Spanish", "Chinese", "French"].index(st.session_state.language),
-                           label_visibility="collapsed", key="sidebar_lang")
-        if lang != st.session_state.language:
-            st.session_state.language = lang
-            st.rerun()
-        
+        st.selectbox("Choose Language", _LANGS, 
+                     index=_LANG_IDX[st.session_state.language],
+                     label_visibility="collapsed", key="sidebar_lang",
+                     on_change=set_language)
+    
+    @st.fragment
+    def render_sidebar_status(t, rag):
         st.markdown("---")
         st.markdown(f"## 🚨 {t['emergency']}")
         st.error(f"**☎️ {t['call_911']}**")
@@ -862,10 +593,9 @@ else:
         
         st.markdown("---")
         st.markdown("## 📊 System Status")
-        rag = load_rag()
         if rag:
             try:
-                stats = rag.vector_db.get_stats()
+                stats = get_vector_stats()
                 st.success("✅ System Online")
                 st.caption(f"📚 {stats['total_documents']} medical documents")
                 st.caption(f"🔍 RAG System: Active")
@@ -873,22 +603,264 @@ else:
                 st.warning("⚠️ Limited Mode")
         else:
             st.error("❌ System Offline")
+            if st.session_state.get('rag_error'):
+                st.caption(f"Reason: {st.session_state.rag_error}")
+    
+    def go_to_section(section):
+        st.session_state.active_tab = section
+    
+    # Not a fragment: switching section needs the whole script to rerun. The
+    # callbacks set the section picker before that run starts
+    def render_quick_actions():
+        st.markdown("### ⚡ Quick Actions")
+        st.button("📝 Log New Symptom", use_container_width=True, key="qa_symptom",
+                  on_click=go_to_section, args=('symptom',))
+        st.button("📄 Analyze Document", use_container_width=True, key="qa_doc",
+                  on_click=go_to_section, args=('doc',))
+        st.button("💬 Chat with AI", use_container_width=True, key="qa_chat",
+                  on_click=go_to_section, args=('ai',))
+    
+    @st.fragment
+    def render_profile_editor(profile, basic, health, lifestyle):
+        st.markdown("---")
+        st.markdown("## ⚙️ Edit Your Profile")
+        
+        edit_type = st.radio("Select what to edit:", ["Basic Info", "Health Info", "Lifestyle", "✖️ Close"], 
+                           horizontal=True, key="edit_radio")
+        
+        if edit_type == "Basic Info":
+            with st.form("edit_basic"):
+                st.markdown("### 📋 Basic Information")
+                col1, col2 = st.columns(2)
+                with col1:
+                    name = st.text_input("Name", value=basic.get('name', ''))
+                    age = st.number_input("Age", value=basic.get('age', 30), min_value=1)
+                with col2:
+                    gender = st.selectbox("Gender", _GENDERS,
+                                        index=_GENDER_IDX.get(basic.get('gender'), 0))
+                
+                if st.form_submit_button("💾 Save Changes", type="primary"):
+                    profile.update_basic_info(name=name, age=age, gender=gender)
+                    st.toast("✅ Profile updated successfully!")
+                    st.session_state.show_profile_editor = False
+                    st.rerun()
+        
+        elif edit_type == "Health Info":
+            with st.form("edit_health"):
+                st.markdown("### 🏥 Health Information")
+                col1, col2 = st.columns(2)
+                with col1:
+                    height = st.number_input("Height (cm)", value=health.get('height', 170), min_value=50, max_value=250)
+                    weight = st.number_input("Weight (kg)", value=health.get('weight', 70), min_value=20, max_value=300)
+                with col2:
+                    blood_type = st.selectbox("Blood Type", _BLOOD_TYPES,
+                                             index=_BLOOD_IDX.get(health.get('blood_type'), 0))
+                
+                if st.form_submit_button("💾 Save Changes", type="primary"):
+                    profile.update_health_info(height=height, weight=weight, 
+                                              blood_type=blood_type if blood_type != "Unknown" else None)
+                    st.toast("✅ Health information updated!")
+                    st.session_state.show_profile_editor = False
+                    st.rerun()
+        
+        elif edit_type == "Lifestyle":
+            with st.form("edit_lifestyle"):
+                st.markdown("### 🏃 Lifestyle Factors")
+                col1, col2 = st.columns(2)
+                with col1:
+                    smoking = st.selectbox("Smoking", ["Never", "Former", "Current"],
+                        index=_SMOKE_IDX.get(lifestyle.get('smoking'), 0))
+                    alcohol = st.selectbox("Alcohol", ["None", "Occasional", "Moderate", "Heavy"],
+                        index=_ALCOHOL_IDX.get(lifestyle.get('alcohol'), 0))
+                with col2:
+                    exercise = st.selectbox("Exercise", ["Sedentary", "Light", "Moderate", "Active"],
+                        index=_EXERCISE_IDX.get(lifestyle.get('exercise'), 0))
+                    diet = st.selectbox("Diet", ["Balanced", "Vegetarian", "Vegan", "Other"],
+                        index=_DIET_IDX.get(lifestyle.get('diet'), 0))
+                
+                if st.form_submit_button("💾 Save Changes", type="primary"):
+                    maps = {
+                        "Never": "never", "Former": "former", "Current": "current",
+                        "None": "none", "Occasional": "occasional", "Moderate": "moderate", "Heavy": "heavy",
+                        "Sedentary": "sedentary", "Light": "light", "Moderate": "moderate", "Active": "active",
+                        "Balanced": "balanced", "Vegetarian": "vegetarian", "Vegan": "vegan", "Other": "other"
+                    }
+                    profile.update_lifestyle(
+                        smoking=maps[smoking],
+                        alcohol=maps[alcohol],
+                        exercise=maps[exercise],
+                        diet=maps.get(diet, 'balanced')
+                    )
+                    st.toast("✅ Lifestyle updated!")
+                    st.session_state.show_profile_editor = False
+                    st.rerun()
+        
+        else:
+            st.session_state.show_profile_editor = False
+            st.rerun()
     
-    # Track active tab using session state
-    if 'active_tab' not in st.session_state:
-        st.session_state.active_tab = 0
+    @st.fragment
+    def render_specialist_finder(specialist_matcher, entries):
+        st.markdown("---")
+        st.markdown("### 👨‍⚕️ Find the Right Specialist")
+        
+        recent_symptoms = [e['symptom'] for e in entries[-5:]]
+        st.write(f"**Based on recent symptoms:** {', '.join(recent_symptoms[:3])}")
+        
+        col_spec1, col_spec2, col_spec3 = st.columns([1, 2, 1])
+        with col_spec2:
+            if st.button("🔍 Find Specialist", type="primary", use_container_width=True):
+                with st.spinner("🔎 Analyzing symptoms and matching specialists..."):
+                    match = specialist_matcher.match_specialist(recent_symptoms)
+                    
+                    if match['specialists']:
+                        st.markdown("---")
+                        st.markdown("### 🎯 Recommended Specialists")
+                        
+                        st.markdown("".join(  # Top 3, sent as one element
+                            SPECIALIST_CARD_TMPL.format(**spec) for spec in match['specialists'][:3]
+                        ), unsafe_allow_html=True)
+                        
+                        if match['urgency'] == 'urgent':
+                            st.error("🚨 **URGENT:** Your symptoms may require immediate medical attention. Please seek care promptly.")
+                    else:
+                        st.info("💡 Unable to match specialists. Consider consulting a general practitioner.")
+    
+    def format_chat_block(messages):
+        """Several chat turns as one markdown block"""
+        return "\n\n---\n\n".join(
+            f"{'🤖' if msg['role'] == 'assistant' else '👤'} {msg['content']}" for msg in messages
+        )
+    
+    def trim_chat_history():
+        """Move turns beyond _CHAT_HISTORY_LIMIT from session memory to disk"""
+        history = st.session_state.chat_history
+        overflow = len(history) - _CHAT_HISTORY_LIMIT
+        if overflow > 0:
+            get_assistant().archive_messages(st.session_state.chat_session_id, history[:overflow])
+            del history[:overflow]
+            st.session_state.chat_archived += overflow
+    
+    def queue_chat_message():
+        """Send-button callback: record the question before the chat redraws,
+        so one rerun both shows it and answers it"""
+        user_input = st.session_state.chat_text_input
+        if user_input:
+            st.session_state.chat_history.append({'role': 'user', 'content': user_input})
+            st.session_state.pending_chat = user_input
+    
+    @st.fragment
+    def render_assistant_chat(profile, rag):
+        # Initialize chat
+        if not st.session_state.chat_history:
+            st.session_state.chat_history = [{
+                'role': 'assistant',
+                'content': f"Hello, {profile.get_basic_info().get('name', 'there')}! 👋 I'm your AI healthcare assistant. I can help answer health questions, explain medical terms, or discuss your symptoms. How can I assist you today?"
+            }]
+        
+        # Archived turns are only read back from disk when asked for
+        if st.session_state.chat_archived:
+            if st.toggle(f"📜 Show {st.session_state.chat_archived} earlier messages",
+                         key="show_archived_chat"):
+                archived = get_assistant().get_archived_messages(st.session_state.chat_session_id)
+                st.markdown(format_chat_block(archived))
+                st.markdown("---")
+        
+        # Display chat history: older turns as one block, recent ones as bubbles
+        history = st.session_state.chat_history
+        older, recent = history[:-_CHAT_BUBBLES], history[-_CHAT_BUBBLES:]
+        if older:
+            st.markdown(format_chat_block(older))
+            st.markdown("---")
+        for msg in recent:
+            with st.chat_message(msg['role'], avatar="🤖" if msg['role'] == 'assistant' else "👤"):
+                st.markdown(msg['content'])
+        
+        # Answer the question queued by the send callback, drawing the reply
+        # in place under the history instead of rerunning to show it
+        user_input = st.session_state.pop('pending_chat', None)
+        if user_input:
+            if rag:
+                # Ground the reply in the retrieved passages themselves rather
+                # than a full RAG answer, which cost a second, unstreamed LLM
+                # call before the first token of the reply
+                with st.spinner("🤖 Thinking..."):
+                    profile_context = get_profile_context(profile, profile.version)
+                    retrieved = cached_rag_retrieve(rag, user_input, n_results=3)
+                    docs = retrieved.get('context_docs')
+                    medical_context = truncate_to_tokens(
+                        "\n\n".join(doc['document'] for doc in docs) if docs else retrieved['answer'],
+                        300
+                    )
+                    
+                    prompt = f"""Patient Profile:
+{profile_context}
+
+Patient Question: {user_input}
+
+Medical Context: {medical_context}
+
+As a caring healthcare AI assistant, provide a brief, personalized response (3-4 sentences).
+Consider the patient's profile and be conversational yet professional."""
+                
+                # Show the reply as it is generated rather than after the
+                # last token
+                with st.chat_message('assistant', avatar="🤖"):
+                    response = st.write_stream(
+                        _LLM_SENTINEL_RE.sub('', piece) for piece in rag.llm.stream([
+                            {"role": "system", "content": "You are a knowledgeable and empathetic healthcare AI assistant."},
+                            {"role": "user", "content": prompt}
+                        ], temperature=0.4, max_tokens=500)
+                    )
+                    
+                    # A marker split across two pieces survives the per-piece
+                    # filter, so clean the stored copy as a whole
+                    response = _LLM_SENTINEL_RE.sub('', stream_text(response)).strip()
+                    if not response:
+                        response = _EMPTY_REPLY
+                        st.markdown(response)
+            else:
+                st.error("❌ AI system is offline. Please try again later.")
+                response = "I apologize, but I'm currently offline. Please try again in a moment."
+                with st.chat_message('assistant', avatar="🤖"):
+                    st.markdown(response)
+            
+            st.session_state.chat_history.append({
+                'role': 'assistant',
+                'content': response
+            })
+            trim_chat_history()
+        
+        # Chat input (using form since st.chat_input can't be in tabs)
+        st.markdown("---")
+        with st.form("chat_form", clear_on_submit=True):
+            col_input, col_btn = st.columns([4, 1])
+            with col_input:
+                st.text_area("Message", height=100, 
+                             placeholder="💭 Type your message here...",
+                             label_visibility="collapsed",
+                             key="chat_text_input")
+            with col_btn:
+                st.markdown("<br>", unsafe_allow_html=True)  # Spacing
+                st.form_submit_button("📤 Send", type="primary", use_container_width=True,
+                                      on_click=queue_chat_message)
+    
+    # Sidebar
+    with st.sidebar:
+        render_sidebar_profile(profile, summary)
+        render_language_picker()
+        render_sidebar_status(t, rag)
     
-    # Main tabs with modern icons
-    tab_dash, tab_qa, tab_doc, tab_symptom, tab_ai = st.tabs([
-        "🏠 Dashboard", "🔍 Medical Q&A", "📄 Doc Analyzer", "📊 Symptom Tracker", "💬 AI Assistant"
-    ])
+    # Main sections with modern icons. st.tabs would run every tab's body on
+    # each rerun and only hide the inactive ones; a radio runs just the
+    # selected one
+    section = st.radio("Section", list(_SECTIONS), format_func=_SECTIONS.get,
+                       horizontal=True, label_visibility="collapsed", key="active_tab")
     
     # ==================== TAB: DASHBOARD ====================
-    with tab_dash:
+    if section == 'dash':
         st.markdown("### 🏠 Your Personal Health Dashboard")
         
-        profile = st.session_state.user_profile
-        summary = profile.get_profile_summary()
         basic = profile.get_basic_info()
         health = profile.get_health_info()
         lifestyle = profile.get_lifestyle()
@@ -903,16 +875,14 @@ else:
             st.metric("👤 Age", f"{summary['age']}" if summary['age'] else "Not set", help="Your current age")
         with col2:
             if summary['bmi']:
-                bmi_value = summary['bmi']
-                bmi_cat = summary['bmi_category']
-                st.metric("📊 BMI", bmi_value, delta=bmi_cat, delta_color="off", help="Body Mass Index")
+                st.metric("📊 BMI", f"{summary['bmi_color']} {summary['bmi']}", delta=summary['bmi_category'],
+                         delta_color="off", help="Body Mass Index")
             else:
                 st.metric("📊 BMI", "Not calculated", help="Set height and weight to calculate")
         with col3:
             st.metric("🏥 Conditions", summary['conditions_count'], help="Tracked chronic conditions")
         with col4:
-            risk_color = {'Low': '🟢', 'Moderate': '🟡', 'High': '🔴'}
-            risk_icon = risk_color.get(summary['lifestyle_risk'], '⚪')
+            risk_icon = _RISK_EMOJI.get(summary['lifestyle_risk'], '⚪')
             st.metric("⚕️ Lifestyle Risk", f"{risk_icon} {summary['lifestyle_risk']}", 
                      help="Based on smoking, alcohol, and exercise habits")
         
@@ -953,26 +923,14 @@ else:
                     st.info("✅ No chronic conditions recorded")
         
         with col_right:
-            st.markdown("### ⚡ Quick Actions")
-            if st.button("📝 Log New Symptom", use_container_width=True, key="qa_symptom"):
-                st.info("Switch to the Symptom Tracker tab →")
-            if st.button("📄 Analyze Document", use_container_width=True, key="qa_doc"):
-                st.info("Switch to the Doc Analyzer tab →")
-            if st.button("💬 Chat with AI", use_container_width=True, key="qa_chat"):
-                st.info("Switch to the AI Assistant tab →")
+            render_quick_actions()
             
             st.markdown("---")
             st.markdown("### 🏃 Lifestyle Factors")
             
-            icons = {
-                'smoking': {'never': '✅ Non-smoker', 'former': '⚠️ Former smoker', 'current': '🚫 Current smoker'},
-                'exercise': {'sedentary': '😴 Sedentary', 'light': '🚶 Light activity', 'moderate': '🏃 Moderate activity', 'active': '💪 Very active'},
-                'alcohol': {'none': '✅ No alcohol', 'occasional': '🍷 Occasional', 'moderate': '⚠️ Moderate', 'heavy': '🚫 Heavy use'}
-            }
-            
-            st.write("🚭 " + icons['smoking'].get(lifestyle.get('smoking', 'never'), 'Not set'))
-            st.write("🏃 " + icons['exercise'].get(lifestyle.get('exercise', 'sedentary'), 'Not set'))
-            st.write("🍷 " + icons['alcohol'].get(lifestyle.get('alcohol', 'none'), 'Not set'))
+            st.write("🚭 " + _LIFESTYLE_MAP['smoking'].get(lifestyle.get('smoking', 'never'), 'Not set'))
+            st.write("🏃 " + _LIFESTYLE_MAP['exercise'].get(lifestyle.get('exercise', 'sedentary'), 'Not set'))
+            st.write("🍷 " + _LIFESTYLE_MAP['alcohol'].get(lifestyle.get('alcohol', 'none'), 'Not set'))
             
             st.markdown("---")
             
@@ -984,7 +942,7 @@ else:
             with col_e2:
                 if st.button("🔄 Reset All", use_container_width=True):
                     if st.session_state.get('confirm_reset'):
-                        st.session_state.user_profile.reset_profile()
+                        profile.reset_profile()
                         st.session_state.show_onboarding = True
                         st.session_state.confirm_reset = False
                         st.rerun()
@@ -994,145 +952,65 @@ else:
         
         # Profile Editor
         if st.session_state.get('show_profile_editor', False):
-            st.markdown("---")
-            st.markdown("## ⚙️ Edit Your Profile")
-            
-            edit_type = st.radio("Select what to edit:", ["Basic Info", "Health Info", "Lifestyle", "✖️ Close"], 
-                               horizontal=True, key="edit_radio")
-            
-            if edit_type == "Basic Info":
-                with st.form("edit_basic"):
-                    st.markdown("### 📋 Basic Information")
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        name = st.text_input("Name", value=basic.get('name', ''))
-                        age = st.number_input("Age", value=basic.get('age', 30), min_value=1)
-                    with col2:
-                        gender = st.selectbox("Gender", ["Male", "Female", "Other"], 
-                                            index=["Male", "Female", "Other"].index(basic.get('gender', 'Male')) if basic.get('gender') in ["Male", "Female", "Other"] else 0)
-                    
-                    if st.form_submit_button("💾 Save Changes", type="primary"):
-                        profile.update_basic_info(name=name, age=age, gender=gender)
-                        st.success("✅ Profile updated successfully!")
-                        st.session_state.show_profile_editor = False
-                        import time
-                        time.sleep(1)
-                        st.rerun()
-            
-            elif edit_type == "Health Info":
-                with st.form("edit_health"):
-                    st.markdown("### 🏥 Health Information")
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        height = st.number_input("Height (cm)", value=health.get('height', 170), min_value=50, max_value=250)
-                        weight = st.number_input("Weight (kg)", value=health.get('weight', 70), min_value=20, max_value=300)
-                    with col2:
-                        blood_type = st.selectbox("Blood Type", 
-                                                 ["Unknown", "A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"],
-                                                 index=["Unknown", "A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"].index(health.get('blood_type', 'Unknown')) if health.get('blood_type') else 0)
-                    
-                    if st.form_submit_button("💾 Save Changes", type="primary"):
-                        profile.update_health_info(height=height, weight=weight, 
-                                                  blood_type=blood_type if blood_type != "Unknown" else None)
-                        st.success("✅ Health information updated!")
-                        st.session_state.show_profile_editor = False
-                        import time
-                        time.sleep(1)
-                        st.rerun()
-            
-            elif edit_type == "Lifestyle":
-                with st.form("edit_lifestyle"):
-                    st.markdown("### 🏃 Lifestyle Factors")
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        smoking = st.selectbox("Smoking", ["Never", "Former", "Current"],
-                            index=["never", "former", "current"].index(lifestyle.get('smoking', 'never')))
-                        alcohol = st.selectbox("Alcohol", ["None", "Occasional", "Moderate", "Heavy"],
-                            index=["none", "occasional", "moderate", "heavy"].index(lifestyle.get('alcohol', 'none')))
-                    with col2:
-                        exercise = st.selectbox("Exercise", ["Sedentary", "Light", "Moderate", "Active"],
-                            index=["sedentary", "light", "moderate", "active"].index(lifestyle.get('exercise', 'sedentary')))
-                        diet = st.selectbox("Diet", ["Balanced", "Vegetarian", "Vegan", "Other"],
-                            index=["balanced", "vegetarian", "vegan", "other"].index(lifestyle.get('diet', 'balanced')) if lifestyle.get('diet') else 0)
-                    
-                    if st.form_submit_button("💾 Save Changes", type="primary"):
-                        maps = {
-                            "Never": "never", "Former": "former", "Current": "current",
-                            "None": "none", "Occasional": "occasional", "Moderate": "moderate", "Heavy": "heavy",
-                            "Sedentary": "sedentary", "Light": "light", "Moderate": "moderate", "Active": "active",
-                            "Balanced": "balanced", "Vegetarian": "vegetarian", "Vegan": "vegan", "Other": "other"
-                        }
-                        profile.update_lifestyle(
-                            smoking=maps[smoking],
-                            alcohol=maps[alcohol],
-                            exercise=maps[exercise],
-                            diet=maps.get(diet, 'balanced')
-                        )
-                        st.success("✅ Lifestyle updated!")
-                        st.session_state.show_profile_editor = False
-                        import time
-                        time.sleep(1)
-                        st.rerun()
-            
-            else:
-                st.session_state.show_profile_editor = False
-                st.rerun()
+            render_profile_editor(profile, basic, health, lifestyle)
     
     # ==================== TAB: MEDICAL Q&A ====================
-    with tab_qa:
+    elif section == 'qa':
         st.markdown("### 🔍 Medical Questions & Answers")
         st.warning("⚠️ **Disclaimer:** This is for educational purposes only. Not a substitute for professional medical advice.")
         
-        query = st.text_area("💭 What would you like to know?", height=120, 
-                           placeholder=t['search_placeholder'], key="qa_input")
-        
-        col_btn1, col_btn2, col_btn3 = st.columns([1, 2, 1])
-        with col_btn2:
-            search_btn = st.button(f"🔍 {t['search_btn']}", type="primary", use_container_width=True)
+        # Editing the question only reruns the script once, on submit
+        with st.form("qa_search"):
+            query = st.text_area("💭 What would you like to know?", height=120, 
+                               placeholder=t['search_placeholder'], key="qa_input")
+            
+            col_btn1, col_btn2, col_btn3 = st.columns([1, 2, 1])
+            with col_btn2:
+                search_btn = st.form_submit_button(f"🔍 {t['search_btn']}", type="primary", use_container_width=True)
         
         if search_btn and query:
-            rag = load_rag()
             if rag:
-                with st.spinner("🔎 Searching medical databases..."):
-                    result = rag.query(query, n_results=5)
-                
-                if result.get('is_emergency'):
+                # Emergencies are answered straight from the keyword scan,
+                # before any embedding, retrieval or LLM work
+                safety = rag.safety.check_query(query)
+                if safety['level'] == 'EMERGENCY':
                     st.error("🚨 **EMERGENCY DETECTED - CALL 911 IMMEDIATELY**")
-                    st.error(result.get('emergency_message', ''))
+                    st.error(safety['message'])
                     st.stop()
                 
                 st.markdown("---")
                 st.markdown("### 📋 Answer")
-                st.markdown(f"""
-                <div class='info-card'>
-                    {result['answer']}
-                </div>
-                """, unsafe_allow_html=True)
+                
+                # A new answer streams in here as it is generated, then is
+                # redrawn as a card; cached answers appear straight away
+                answer_slot = st.empty()
+                result = cached_rag_query(rag, query, n_results=5, answer_slot=answer_slot)
+                answer_slot.markdown(INFO_CARD_TMPL.format(body=result['answer']), unsafe_allow_html=True)
                 
                 if result.get('sources'):
                     st.markdown("### 📚 Trusted Medical Sources")
                     st.caption(f"Information verified from {len(result['sources'])} trusted sources")
                     
+                    # Build every card in one pass and send them as one element
+                    cards = []
                     for i, src in enumerate(result['sources'], 1):
-                        st.markdown(f"""
-                        <div class='source-card'>
-                            <strong>{i}. {src.get('source', 'Medical Source')}</strong><br>
-                            <span style='color: #64748b;'>{src.get('title', 'Medical Information')}</span><br>
-                            <a href="{src.get('url', '#')}" target="_blank">🔗 Read Full Article →</a>
-                        </div>
-                        """, unsafe_allow_html=True)
+                        cards.append(SOURCE_CARD_TMPL.format(
+                            i=i,
+                            source=src.get('source', 'Medical Source'),
+                            title=src.get('title', 'Medical Information'),
+                            url=src.get('url', '#')
+                        ))
+                    st.markdown("".join(cards), unsafe_allow_html=True)
             else:
                 st.error("❌ System is currently offline. Please try again later.")
     
     # ==================== TAB: DOCUMENT ANALYZER ====================
-    with tab_doc:
+    elif section == 'doc':
         st.markdown("### 📄 Medical Document Analyzer")
         st.caption("Upload lab results, medical reports, or prescriptions for AI analysis")
         
-        rag_system = load_rag()
-        analyzer = EnhancedDocumentAnalyzer(rag_system=rag_system)
+        analyzer = get_analyzer(rag, id(rag))
         
-        profile = st.session_state.user_profile
         profile_gender = profile.get_basic_info().get('gender')
         
         col_upload, col_settings = st.columns([2, 1])
@@ -1145,7 +1023,7 @@ else:
         with col_settings:
             gender = st.selectbox("👤 Patient Gender", 
                 ["Not specified", "Male", "Female"],
-                index=0 if not profile_gender else (["Male", "Female"].index(profile_gender) + 1 if profile_gender in ["Male", "Female"] else 0))
+                index=_PATIENT_GENDER_IDX.get(profile_gender, 0))
         
         if uploaded_file:
             st.success(f"✅ File uploaded: **{uploaded_file.name}**")
@@ -1153,12 +1031,8 @@ else:
             st.markdown("---")
             st.markdown("### 🔬 Analysis Options")
             
-            analysis_type = st.radio("Select analysis type:", 
-                ["🔬 Comprehensive Lab Analysis", 
-                 "📋 Explain All Results", 
-                 "⚠️ Highlight Abnormal Values Only", 
-                 "❓ Generate Questions for Doctor", 
-                 "💊 Medication Review"],
+            analysis_type = st.radio("Select analysis type:", list(_ANALYSES),
+                format_func=_ANALYSES.get,
                 key="analysis_type_radio")
             
             col_analyze1, col_analyze2, col_analyze3 = st.columns([1, 2, 1])
@@ -1167,11 +1041,14 @@ else:
             
             if analyze_btn:
                 with st.spinner("🧬 Analyzing your medical document..."):
-                    file_bytes = uploaded_file.getvalue()
                     gender_param = None if gender == "Not specified" else gender
                     
-                    if "Lab Analysis" in analysis_type or "Lab Values" in analysis_type:
-                        result = analyzer.analyze_document(file_bytes, uploaded_file.type, gender_param)
+                    if analysis_type == 'lab':
+                        # Hash the upload's buffer in place and hand the
+                        # file itself over, so the bytes are never copied
+                        result = analyze_upload(analyzer, id(rag),
+                                                content_hash(uploaded_file.getbuffer()), uploaded_file,
+                                                uploaded_file.type, gender_param)
                         
                         if 'error' not in result:
                             st.success("✅ Analysis complete!")
@@ -1189,11 +1066,7 @@ else:
                             
                             st.markdown("---")
                             st.markdown("### 📋 Detailed Report")
-                            st.markdown(f"""
-                            <div class='info-card'>
-                                {result['report']}
-                            </div>
-                            """, unsafe_allow_html=True)
+                            st.markdown(INFO_CARD_TMPL.format(body=result['report']), unsafe_allow_html=True)
                         else:
                             st.error(f"❌ Error: {result['error']}")
                     else:
@@ -1202,12 +1075,12 @@ else:
             st.info("👆 Please upload a medical document to get started")
     
     # ==================== TAB: SYMPTOM TRACKER ====================
-    with tab_symptom:
+    elif section == 'symptom':
         st.markdown("### 📊 Symptom Tracker & Specialist Finder")
         st.caption("Track your symptoms and find the right medical specialist")
         
-        tracker = SymptomTracker()
-        specialist_matcher = SpecialistMatcher(rag_system=load_rag())
+        tracker = get_symptom_tracker()
+        specialist_matcher = get_specialist_matcher(rag, id(rag))
         
         col_form, col_insights = st.columns([2, 1])
         
@@ -1265,135 +1138,54 @@ else:
             st.markdown("---")
             st.markdown("### 📜 Symptom History")
             
-            # Show recent entries
-            recent_entries = entries[-10:][::-1]  # Last 10, reversed
-            
-            for idx, entry in enumerate(recent_entries, 1):
-                severity_color = "🟢" if entry['severity'] < 4 else "🟡" if entry['severity'] < 7 else "🔴"
-                
-                with st.expander(f"{severity_color} {entry['symptom']} - Severity: {entry['severity']}/10"):
-                    st.write(f"**Date:** {entry['timestamp']}")
-                    if entry.get('notes'):
-                        st.write(f"**Notes:** {entry['notes']}")
+            # Show recent entries (last 10, newest first) as one table rather
+            # than one expander each; ticked rows can be deleted
+            recent_entries = entries[:-11:-1]
+            editor_key = "symptom_history_" + "_".join(e['id'] for e in recent_entries)
             
-            st.markdown("---")
-            st.markdown("### 👨‍⚕️ Find the Right Specialist")
+            edited = st.data_editor(
+                [{
+                    'delete': False,
+                    'level': _SEVERITY_ICON.get(e['severity'], _UNKNOWN_SEVERITY_ICON),
+                    'date': e['date_display'],
+                    'symptom': e['symptom'],
+                    'severity': e['severity'],
+                    'notes': e.get('notes', '')
+                } for e in recent_entries],
+                key=editor_key,
+                disabled=['level', 'date', 'symptom', 'severity', 'notes'],
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    'delete': st.column_config.CheckboxColumn("🗑️", width="small"),
+                    'level': st.column_config.TextColumn("", width="small"),
+                    'date': "Date",
+                    'symptom': "Symptom",
+                    'severity': st.column_config.ProgressColumn(
+                        "Severity", min_value=0, max_value=10, format="%d/10"
+                    ),
+                    'notes': "Notes"
+                }
+            )
             
-            recent_symptoms = [e['symptom'] for e in entries[-5:]]
-            st.write(f"**Based on recent symptoms:** {', '.join(recent_symptoms[:3])}")
+            selected = [e for e, row in zip(recent_entries, edited) if row['delete']]
+            if st.button(f"🗑️ Delete Selected ({len(selected)})", disabled=not selected,
+                         key="delete_symptoms"):
+                for entry in selected:
+                    tracker.delete_entry(entry['id'])
+                st.rerun()
             
-            col_spec1, col_spec2, col_spec3 = st.columns([1, 2, 1])
-            with col_spec2:
-                if st.button("🔍 Find Specialist", type="primary", use_container_width=True):
-                    with st.spinner("🔎 Analyzing symptoms and matching specialists..."):
-                        match = specialist_matcher.match_specialist(recent_symptoms)
-                        
-                        if match['specialists']:
-                            st.markdown("---")
-                            st.markdown("### 🎯 Recommended Specialists")
-                            
-                            for spec in match['specialists'][:3]:  # Top 3
-                                st.markdown(f"""
-                                <div class='info-card'>
-                                    <h3>{spec['icon']} {spec['name']}</h3>
-                                    <p><strong>Confidence:</strong> {spec['confidence']:.0f}%</p>
-                                    <p><strong>Specializes in:</strong> {spec['treats']}</p>
-                                </div>
-                                """, unsafe_allow_html=True)
-                            
-                            if match['urgency'] == 'urgent':
-                                st.error("🚨 **URGENT:** Your symptoms may require immediate medical attention. Please seek care promptly.")
-                        else:
-                            st.info("💡 Unable to match specialists. Consider consulting a general practitioner.")
+            render_specialist_finder(specialist_matcher, entries)
         else:
             st.info("👆 Start tracking your symptoms to get specialist recommendations")
     
     # ==================== TAB: AI ASSISTANT ====================
-    with tab_ai:
+    elif section == 'ai':
         st.markdown("### 💬 AI Healthcare Assistant")
         st.caption("Chat with your personalized AI health assistant")
         
-        profile = st.session_state.user_profile
-        assistant = HealthcareAssistant()
-        
-        # Initialize chat
-        if not st.session_state.chat_history:
-            st.session_state.chat_history = [{
-                'role': 'assistant',
-                'content': f"Hello, {profile.get_basic_info().get('name', 'there')}! 👋 I'm your AI healthcare assistant. I can help answer health questions, explain medical terms, or discuss your symptoms. How can I assist you today?"
-            }]
-        
-        # Display chat history
-        for msg in st.session_state.chat_history:
-            with st.chat_message(msg['role'], avatar="🤖" if msg['role'] == 'assistant' else "👤"):
-                st.markdown(msg['content'])
-        
-        # Chat input (using form since st.chat_input can't be in tabs)
-        st.markdown("---")
-        with st.form("chat_form", clear_on_submit=True):
-            col_input, col_btn = st.columns([4, 1])
-            with col_input:
-                user_input = st.text_area("Message", height=100, 
-                                         placeholder="💭 Type your message here...",
-                                         label_visibility="collapsed",
-                                         key="chat_text_input")
-            with col_btn:
-                st.markdown("<br>", unsafe_allow_html=True)  # Spacing
-                send_btn = st.form_submit_button("📤 Send", type="primary", use_container_width=True)
-        
-        if send_btn and user_input:
-            # Add user message
-            st.session_state.chat_history.append({'role': 'user', 'content': user_input})
-            
-            # Generate response
-            rag = load_rag()
-            if rag:
-                with st.spinner("🤖 Thinking..."):
-                    profile_context = profile.get_context_for_ai()
-                    rag_result = rag.query(user_input, n_results=3)
-                    
-                    prompt = f"""Patient Profile:
-{profile_context}
-
-Patient Question: {user_input}
-
-Medical Context: {rag_result['answer'][:1200]}
-
-As a caring healthcare AI assistant, provide a brief, personalized response (3-4 sentences).
-Consider the patient's profile and be conversational yet professional."""
-                    
-                    response = rag.llm.generate([
-                        {"role": "system", "content": "You are a knowledgeable and empathetic healthcare AI assistant."},
-                        {"role": "user", "content": prompt}
-                    ], temperature=0.4, max_tokens=500)
-                    
-                    response = response.replace('<s>', '').replace('</s>', '').strip()
-                    
-                    st.session_state.chat_history.append({
-                        'role': 'assistant',
-                        'content': response
-                    })
-                    
-                    st.rerun()
-            else:
-                st.error("❌ AI system is offline. Please try again later.")
-                st.session_state.chat_history.append({
-                    'role': 'assistant',
-                    'content': "I apologize, but I'm currently offline. Please try again in a moment."
-                })
-                st.rerun()
+        render_assistant_chat(profile, rag)
     
     # ==================== FOOTER ====================
     st.markdown("---")
-    st.markdown("""
-    <div class='app-footer'>
-        <h3>🏥 Health Compass</h3>
-        <p style='font-size: 1.1rem; font-weight: 600; color: #0891b2;'>Your AI-Powered Medical Companion</p>
-        <p style='margin-top: 1rem;'>📚 Educational Information Only • Not Medical Advice</p>
-        <p style='color: #94a3b8; font-size: 0.9rem; margin-top: 1.5rem;'>
-            INFO 7390 Advanced Data Science & Architecture<br>
-            Final Project by <strong>Manish Kumar</strong><br>
-            Northeastern University • Khoury College of Computer Sciences
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(FOOTER_HTML, unsafe_allow_html=True)
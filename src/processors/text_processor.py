@@ -3,6 +3,8 @@ from pathlib import Path
 import re
 from tqdm import tqdm
 
+from ..utils.cache import content_hash
+
 class TextProcessor:
     """Process and clean scraped health data"""
     
@@ -10,6 +12,20 @@ class TextProcessor:
         self.raw_dir = Path("data/raw")
         self.processed_dir = Path("data/processed")
         self.processed_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Content hashes of scraped pages already processed, so the same
+        # page saved twice (or under two URLs) is only chunked once
+        self.seen_docs = set()
+        self.duplicate_docs = 0
+    
+    def is_duplicate_doc(self, text):
+        """Check (and record) whether this page's text was already processed"""
+        key = content_hash(text)
+        if key in self.seen_docs:
+            self.duplicate_docs += 1
+            return True
+        self.seen_docs.add(key)
+        return False
     
     def clean_text(self, text):
         """Clean and normalize text"""
@@ -41,26 +57,37 @@ class TextProcessor:
     
     def process_medlineplus(self):
         """Process MedlinePlus data"""
-        print("📝 Processing MedlinePlus data...")
+        return list(self.iter_medlineplus())
+    
+    def iter_medlineplus(self, show_progress=True):
+        """Yield MedlinePlus chunks one document at a time"""
+        tqdm.write("📝 Processing MedlinePlus data...")
         
         medline_dir = self.raw_dir / "medlineplus"
         if not medline_dir.exists():
-            print("⚠️ MedlinePlus data not found")
-            return []
+            tqdm.write("⚠️ MedlinePlus data not found")
+            return
         
-        processed_docs = []
+        count = 0
         
         files = list(medline_dir.glob("*.json"))
-        for file in tqdm(files, desc="Processing MedlinePlus"):
+        for file in tqdm(files, desc="Processing MedlinePlus", disable=not show_progress):
             try:
                 with open(file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                 
+                page_text = data.get('summary', '') + ''.join(
+                    section.get('content', '') for section in data.get('sections', [])
+                )
+                if self.is_duplicate_doc(page_text):
+                    continue
+                
                 # Process summary
                 if data.get('summary'):
                     chunks = self.chunk_text(data['summary'])
                     for i, chunk in enumerate(chunks):
-                        processed_docs.append({
+                        count += 1
+                        yield {
                             'source': 'MedlinePlus',
                             'url': data.get('url', ''),
                             'title': data.get('title', ''),
@@ -72,13 +99,14 @@ class TextProcessor:
                                 'source_type': 'government',
                                 'organization': 'National Library of Medicine'
                             }
-                        })
+                        }
                 
                 # Process sections
                 for section in data.get('sections', []):
                     chunks = self.chunk_text(section.get('content', ''))
                     for i, chunk in enumerate(chunks):
-                        processed_docs.append({
+                        count += 1
+                        yield {
                             'source': 'MedlinePlus',
                             'url': data.get('url', ''),
                             'title': data.get('title', ''),
@@ -90,28 +118,31 @@ class TextProcessor:
                                 'source_type': 'government',
                                 'organization': 'National Library of Medicine'
                             }
-                        })
+                        }
                 
             except Exception as e:
-                print(f"⚠️ Error processing {file}: {e}")
+                tqdm.write(f"⚠️ Error processing {file}: {e}")
                 continue
         
-        print(f"✅ Processed {len(processed_docs)} MedlinePlus chunks")
-        return processed_docs
+        tqdm.write(f"✅ Processed {count} MedlinePlus chunks")
     
     def process_cdc(self):
         """Process CDC data"""
-        print("📝 Processing CDC data...")
+        return list(self.iter_cdc())
+    
+    def iter_cdc(self, show_progress=True):
+        """Yield CDC chunks one document at a time"""
+        tqdm.write("📝 Processing CDC data...")
         
         cdc_dir = self.raw_dir / "cdc"
         if not cdc_dir.exists():
-            print("⚠️ CDC data not found")
-            return []
+            tqdm.write("⚠️ CDC data not found")
+            return
         
-        processed_docs = []
+        count = 0
         
         files = list(cdc_dir.glob("*.json"))
-        for file in tqdm(files, desc="Processing CDC"):
+        for file in tqdm(files, desc="Processing CDC", disable=not show_progress):
             try:
                 with open(file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
@@ -122,10 +153,11 @@ class TextProcessor:
                     for item in data.get('content', [])
                 ])
                 
-                if full_text:
+                if full_text and not self.is_duplicate_doc(full_text):
                     chunks = self.chunk_text(full_text)
                     for i, chunk in enumerate(chunks):
-                        processed_docs.append({
+                        count += 1
+                        yield {
                             'source': 'CDC',
                             'url': data.get('url', ''),
                             'title': data.get('title', ''),
@@ -137,25 +169,47 @@ class TextProcessor:
                                 'source_type': 'government',
                                 'organization': 'Centers for Disease Control'
                             }
-                        })
+                        }
                 
             except Exception as e:
                 continue
         
-        print(f"✅ Processed {len(processed_docs)} CDC chunks")
-        return processed_docs
+        tqdm.write(f"✅ Processed {count} CDC chunks")
+    
+    def iter_chunks(self, show_progress=True):
+        """Yield chunks from all sources without materializing the full list
+        
+        Pass show_progress=False when the caller wraps this in its own bar.
+        """
+        tqdm.write("🔄 Starting data processing...")
+        
+        self.seen_docs.clear()
+        self.duplicate_docs = 0
+        
+        # Chunks are compared after normalization so boilerplate repeated
+        # across pages (navigation, disclaimers) is embedded only once
+        seen_chunks = set()
+        total = duplicates = 0
+        
+        for source in (self.iter_medlineplus, self.iter_cdc):
+            for chunk in source(show_progress):
+                total += 1
+                key = content_hash(' '.join(chunk['text'].lower().split()))
+                if key in seen_chunks:
+                    duplicates += 1
+                    continue
+                seen_chunks.add(key)
+                yield chunk
+        
+        if total:
+            tqdm.write(
+                f"🧹 Dedup: skipped {self.duplicate_docs} duplicate pages and "
+                f"{duplicates}/{total} duplicate chunks ({duplicates / total:.1%})"
+            )
     
     def process_all(self):
         """Process all scraped data"""
-        print("🔄 Starting data processing...")
-        
-        all_docs = []
-        
-        # Process MedlinePlus
-        all_docs.extend(self.process_medlineplus())
-        
-        # Process CDC
-        all_docs.extend(self.process_cdc())
+        all_docs = list(self.iter_chunks())
         
         # Save processed data
         if all_docs:
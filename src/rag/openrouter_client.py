@@ -1,4 +1,8 @@
 import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
 from openai import OpenAI
 from dotenv import load_dotenv
 
@@ -14,6 +18,9 @@ class OpenRouterClient:
     - mistralai/mistral-7b-instruct:free
     """
     
+    # Identical prompts are common (re-clicked analyses, repeat questions)
+    CACHE_SIZE = 256
+    
     def __init__(self, model="mistralai/mistral-7b-instruct:free"):
         api_key = os.getenv("OPENROUTER_API_KEY")
         
@@ -35,10 +42,82 @@ class OpenRouterClient:
             "X-Title": os.getenv("SITE_NAME", "Health Compass"),
         }
         
+        # sha256(prompt + settings) -> response, least recently used first
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
         print(f"✅ OpenRouter initialized with: {model}")
     
+    def _cache_key(self, messages, temperature, max_tokens):
+        payload = json.dumps([self.model, messages, temperature, max_tokens], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
     def generate(self, messages, temperature=0.3, max_tokens=2000):
-        """Generate response"""
+        """Generate response, reusing the answer for an identical recent request"""
+        key = self._cache_key(messages, temperature, max_tokens)
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        
+        response = self._generate(messages, temperature, max_tokens)
+        
+        # Errors are never cached so the next attempt retries the API
+        if not response.startswith("❌"):
+            with self._cache_lock:
+                self._cache[key] = response
+                if len(self._cache) > self.CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return response
+    
+    def stream(self, messages, temperature=0.3, max_tokens=2000):
+        """Yield the response in pieces as the model produces them
+        
+        Shares generate()'s cache: a cached answer is yielded whole, and a
+        completed stream is stored for the next identical request.
+        """
+        key = self._cache_key(messages, temperature, max_tokens)
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                yield self._cache[key]
+                return
+        
+        pieces = []
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                extra_headers=self.extra_headers,
+                stream=True
+            )
+            for chunk in response:
+                if not chunk.choices:
+                    continue
+                piece = chunk.choices[0].delta.content
+                if piece:
+                    pieces.append(piece)
+                    yield piece
+        except Exception as e:
+            error_msg = str(e)
+            if "credit balance" in error_msg.lower():
+                yield "❌ OpenRouter credits exhausted. Please add more credits or use a different API key."
+            else:
+                yield f"❌ Error: {error_msg}"
+            return
+        
+        # An empty stream is not worth replaying; let the next request retry
+        if not pieces:
+            return
+        with self._cache_lock:
+            self._cache[key] = "".join(pieces)
+            if len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+    
+    def _generate(self, messages, temperature, max_tokens):
+        """Call the API"""
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
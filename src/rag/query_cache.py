@@ -0,0 +1,98 @@
+# src/rag/query_cache.py
+"""
+RAG Query Cache
+- Exact tier: normalized question text -> stored result
+- Semantic tier: near-duplicate questions matched by embedding cosine similarity
+- LRU-bounded so memory stays flat on a long-running server
+- Embeddings are stored int8-quantized, a quarter of the float32 footprint
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+class QueryCache:
+    """In-process two-tier cache for RAG answers"""
+
+    def __init__(self, max_entries: int = 512, similarity_threshold: float = 0.95):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+
+        # key -> (int8 codes, scale, result); most recently used last
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Stacked codes and scales for the semantic tier, rebuilt lazily after writes
+        self._keys = []
+        self._matrix = None
+        self._scales = None
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Case- and whitespace-insensitive key for the exact tier"""
+        return ' '.join(query.lower().split())
+
+    def get(self, key: str) -> Optional[Any]:
+        """Exact-match lookup"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def get_similar(self, embedding: Sequence[float]) -> Optional[Any]:
+        """Result for the most similar cached query, if it clears the threshold"""
+        codes, scale = self._quantize(embedding)
+        with self._lock:
+            if not self._entries:
+                return None
+            if self._matrix is None:
+                self._keys = list(self._entries)
+                self._matrix = np.stack([self._entries[k][0] for k in self._keys])
+                self._scales = np.array([self._entries[k][1] for k in self._keys], dtype=np.float32)
+
+            # Integer dot products (int32 so 384 dims of 127*127 cannot
+            # overflow), then rescale to cosine similarity
+            dots = self._matrix.astype(np.int32) @ codes.astype(np.int32)
+            scores = dots * self._scales * scale
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                return None
+
+            key = self._keys[best]
+            self._entries.move_to_end(key)
+            return self._entries[key][2]
+
+    def put(self, key: str, embedding: Sequence[float], result: Any):
+        """Store a result under both tiers, evicting the least recently used"""
+        with self._lock:
+            self._entries[key] = (*self._quantize(embedding), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    @staticmethod
+    def _quantize(embedding: Sequence[float]) -> Tuple[np.ndarray, float]:
+        """Unit-normalize, then map symmetrically onto int8
+
+        Returns the codes and the factor that turns a code back into its
+        component (already divided by 127).
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+        peak = float(np.abs(vector).max()) if vector.size else 0.0
+        if not peak:
+            return np.zeros(vector.shape, dtype=np.int8), 0.0
+        codes = np.round(vector / peak * 127).astype(np.int8)
+        return codes, peak / 127
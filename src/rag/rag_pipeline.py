@@ -1,15 +1,25 @@
 from .vector_db import FreeVectorDB
 from .openrouter_client import OpenRouterClient
+from ..utils.llm_cache import cached_generate
 from ..utils.safety import SafetyChecker
 
 class HealthCompassRAG:
     """Complete RAG pipeline for Health Compass"""
     
-    def __init__(self):
+    # Retrieve this many times n_results, then keep the best distinct chunks
+    CANDIDATE_MULTIPLIER = 2
+    # Drop chunks this much further (squared L2) than the best match
+    RELEVANCE_MARGIN = 0.25
+    # Low temperature keeps answers close to the sources (and disk-cacheable)
+    ANSWER_TEMPERATURE = 0.2
+    ANSWER_MAX_TOKENS = 1500
+    
+    def __init__(self, vector_db: FreeVectorDB = None):
         print("🚀 Initializing Health Compass RAG System...\n")
         
-        # Initialize components
-        self.vector_db = FreeVectorDB()
+        # Initialize components; reuse an already-open database (and its
+        # loaded embedding model) when the caller has one
+        self.vector_db = vector_db if vector_db is not None else FreeVectorDB()
         self.llm = OpenRouterClient(
             model="mistralai/mistral-7b-instruct:free"
         )
@@ -72,9 +82,62 @@ Educational Response:"""
             {"role": "user", "content": user_message}
         ]
     
-    def query(self, user_question: str, n_results: int = 5) -> dict:
+    def select_context(self, candidates: list, n_results: int) -> list:
+        """Pick up to n_results chunks from distance-sorted candidates
+        
+        Keeps one chunk per page section so near-duplicates do not crowd
+        out other sources, and drops chunks much less relevant than the
+        best one, which would only add noise to the prompt.
+        """
+        if not candidates:
+            return []
+        best = candidates[0]['distance']
+        
+        selected = []
+        seen_sections = set()
+        for doc in candidates:
+            if best is not None and doc['distance'] > best + self.RELEVANCE_MARGIN:
+                break
+            section = (doc['metadata'].get('url'), doc['metadata'].get('section'))
+            if section in seen_sections:
+                continue
+            seen_sections.add(section)
+            selected.append(doc)
+            if len(selected) == n_results:
+                break
+        return selected
+    
+    def query(self, user_question: str, n_results: int = 5, query_embedding=None) -> dict:
         """Process user query through complete RAG pipeline"""
         
+        result = self.retrieve(user_question, n_results=n_results,
+                               query_embedding=query_embedding)
+        messages = result.pop('messages', None)
+        
+        if messages:
+            # Step 4: Generate response with LLM
+            print(f"\n🤖 Step 4: Generating educational response...")
+            result['answer'] = cached_generate(
+                self.llm, messages,
+                temperature=self.ANSWER_TEMPERATURE, max_tokens=self.ANSWER_MAX_TOKENS
+            )
+            print(f"   Response generated ({len(result['answer'])} characters)")
+        
+        print(f"\n✅ Query processed successfully!")
+        print(f"{'='*60}\n")
+        
+        return result
+    
+    def retrieve(self, user_question: str, n_results: int = 5, query_embedding=None) -> dict:
+        """Everything in query() up to the LLM call
+        
+        Returns the same dict as query(), except that when an answer still
+        has to be generated it holds the prompt under 'messages' instead of
+        an 'answer', so the caller can stream it (llm.stream) itself.
+        query_embedding, if the caller already has one, is reused for the
+        search instead of encoding the question again.
+        """
+        
         print(f"\n{'='*60}")
         print(f"Processing query: {user_question[:80]}...")
         print(f"{'='*60}\n")
@@ -95,7 +158,11 @@ Educational Response:"""
         
         # Step 2: Search vector database
         print(f"\n🔍 Step 2: Searching for relevant information...")
-        context_docs = self.vector_db.search(user_question, n_results=n_results)
+        candidates = self.vector_db.search(
+            user_question, n_results=n_results * self.CANDIDATE_MULTIPLIER,
+            query_embedding=query_embedding
+        )
+        context_docs = self.select_context(candidates, n_results)
         print(f"   Found {len(context_docs)} relevant documents")
         
         if not context_docs:
@@ -110,13 +177,7 @@ Educational Response:"""
                 'is_emergency': False
             }
         
-        # Step 3: Generate response with LLM
-        print(f"\n🤖 Step 3: Generating educational response...")
-        messages = self.create_health_prompt(user_question, context_docs)
-        answer = self.llm.generate(messages, temperature=0.2, max_tokens=1500)
-        print(f"   Response generated ({len(answer)} characters)")
-        
-        # Step 4: Extract unique sources
+        # Step 3: Extract unique sources
         sources = []
         seen = set()
         for doc in context_docs:
@@ -131,11 +192,8 @@ Educational Response:"""
                     'credibility': doc['metadata']['credibility']
                 })
         
-        print(f"\n✅ Query processed successfully!")
-        print(f"{'='*60}\n")
-        
         return {
-            'answer': answer,
+            'messages': self.create_health_prompt(user_question, context_docs),
             'sources': sources,
             'safety_alert': safety_result,
             'is_emergency': False,
@@ -1,11 +1,16 @@
 import chromadb
+import torch
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
 import json
+import platform
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 from tqdm import tqdm
 
+from ..utils.cache import DiskCache, content_hash
+from ..utils.config import Config
+
 class FreeVectorDB:
     """100% Free local vector database with ChromaDB"""
     
@@ -20,8 +25,14 @@ class FreeVectorDB:
         
         # Load free embedding model (runs locally)
         print("📥 Loading embedding model (this may take a minute)...")
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        print("✅ Embedding model loaded (384 dimensions)")
+        self.embedding_model, self.embedding_backend = self._load_embedding_model()
+        print(f"✅ Embedding model loaded (384 dimensions, {self.embedding_backend})")
+        
+        # Embeddings are deterministic in (model, backend, text), so keying
+        # the cache on all three lets unchanged chunks skip the encoder
+        self.embedding_cache = DiskCache(
+            namespace=f"embeddings:{Config.EMBEDDING_MODEL}:{self.embedding_backend}"
+        )
         
         # Get or create collection
         self.collection = self.client.get_or_create_collection(
@@ -31,25 +42,128 @@ class FreeVectorDB:
         
         print(f"✅ Vector database ready ({self.collection.count()} documents)")
     
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+    def _load_embedding_model(self):
+        """Load the embedding model on the fastest available backend
+        
+        Prefers ONNX Runtime (int8-quantized on CPU, exported once and cached
+        by sentence-transformers), falling back to PyTorch when onnxruntime
+        is not installed.
+        """
+        try:
+            import onnxruntime as ort
+            
+            provider = (
+                'CUDAExecutionProvider'
+                if 'CUDAExecutionProvider' in ort.get_available_providers()
+                else 'CPUExecutionProvider'
+            )
+            # On CPU prefer the dynamically quantized int8 export published
+            # alongside the model; fall through to fp32 ONNX if it is missing
+            if provider == 'CPUExecutionProvider':
+                file_name = self._int8_onnx_file()
+                try:
+                    model = SentenceTransformer(
+                        Config.EMBEDDING_MODEL,
+                        backend="onnx",
+                        model_kwargs={'provider': provider, 'file_name': file_name}
+                    )
+                    return model, "onnx-int8"
+                except Exception as e:
+                    print(f"⚠️ Quantized ONNX model unavailable ({e}), using fp32 ONNX")
+            
+            model = SentenceTransformer(
+                Config.EMBEDDING_MODEL,
+                backend="onnx",
+                model_kwargs={'provider': provider}
+            )
+            return model, "onnx"
+        except ImportError:
+            pass
+        except Exception as e:
+            print(f"⚠️ ONNX backend unavailable ({e}), using PyTorch")
+        
+        # On GPU load the weights directly in half precision (bf16 where the
+        # card supports it); CPU keeps fp32 where bf16 matmuls are not faster
+        model_kwargs = {}
+        if torch.cuda.is_available():
+            model_kwargs['torch_dtype'] = (
+                torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+            )
+        model = SentenceTransformer(Config.EMBEDDING_MODEL, model_kwargs=model_kwargs)
+        return model, str(model_kwargs.get('torch_dtype', torch.float32)).replace('torch.', '')
+    
+    @staticmethod
+    def _int8_onnx_file() -> str:
+        """Pick the int8 ONNX export that suits this CPU
+        
+        VNNI turns int8 matmuls into single instructions on recent x86;
+        older x86 gets the AVX2 build and ARM its own.
+        """
+        machine = platform.machine().lower()
+        if machine in ('arm64', 'aarch64'):
+            return "onnx/model_qint8_arm64.onnx"
+        try:
+            cpu_flags = Path("/proc/cpuinfo").read_text()
+        except OSError:
+            cpu_flags = ""
+        if "avx512_vnni" in cpu_flags:
+            return "onnx/model_qint8_avx512_vnni.onnx"
+        return "onnx/model_quint8_avx2.onnx"
+    
+    def embed_texts(self, texts: List[str], batch_size: int = 64,
+                    show_progress: bool = True) -> List[List[float]]:
         """Generate embeddings locally (FREE)"""
         embeddings = self.embedding_model.encode(
             texts,
-            show_progress_bar=True,
-            batch_size=32
+            show_progress_bar=show_progress and len(texts) > batch_size,
+            batch_size=batch_size
         )
         return embeddings.tolist()
     
-    def add_documents(self, documents: List[Dict]):
-        """Add documents to vector database"""
+    def warmup(self):
+        """Run one throwaway encode so one-time backend setup (CUDA context,
+        cuBLAS handles, ONNX session allocation) is not billed to the first
+        real query"""
+        with torch.inference_mode():
+            self.embedding_model.encode(['warmup'], batch_size=1)
+    
+    def embed_texts_cached(self, texts: List[str], show_progress: bool = True) -> List[List[float]]:
+        """Generate embeddings, reusing vectors cached on earlier runs"""
+        keys = [content_hash(text) for text in texts]
+        embeddings = self.embedding_cache.get_many(keys)
+        
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in embeddings:
+                missing[key] = text
+        
+        if missing:
+            fresh = self.embed_texts(list(missing.values()), show_progress=show_progress)
+            fresh = dict(zip(missing.keys(), fresh))
+            self.embedding_cache.set_many(fresh)
+            embeddings.update(fresh)
+        
+        if show_progress:
+            print(f"♻️ Reused {len(texts) - len(missing)}/{len(texts)} cached embeddings")
+        return [embeddings[key] for key in keys]
+    
+    def add_documents(self, documents: List[Dict], start_index: int = 0,
+                      show_progress: bool = True):
+        """Add documents to vector database
+        
+        start_index offsets the generated ids so the collection can be
+        filled batch by batch without id collisions. Callers that drive
+        their own progress bar pass show_progress=False to keep it quiet.
+        """
         if not documents:
             print("⚠️ No documents to add")
             return
         
-        print(f"\n📊 Adding {len(documents)} documents to database...")
+        log = print if show_progress else (lambda *args, **kwargs: None)
+        log(f"\n📊 Adding {len(documents)} documents to database...")
         
         # Prepare data
-        ids = [f"doc_{i:06d}" for i in range(len(documents))]
+        ids = [f"doc_{i:06d}" for i in range(start_index, start_index + len(documents))]
         texts = [doc['text'] for doc in documents]
         metadatas = []
         
@@ -65,11 +179,12 @@ class FreeVectorDB:
             metadatas.append(metadata)
         
         # Generate embeddings
-        print("🔢 Generating embeddings...")
-        embeddings = self.embed_texts(texts)
+        log("🔢 Generating embeddings...")
+        embeddings = self.embed_texts_cached(texts, show_progress=show_progress)
         
-        # Add to ChromaDB in batches (to avoid memory issues)
-        batch_size = 100
+        # Add everything in one call where possible; Chroma caps a single
+        # write at max_batch_size, so only split when exceeding that
+        batch_size = self.client.get_max_batch_size()
         total_batches = (len(documents) - 1) // batch_size + 1
         
         for i in range(0, len(documents), batch_size):
@@ -83,37 +198,63 @@ class FreeVectorDB:
                     documents=texts[i:end_idx],
                     metadatas=metadatas[i:end_idx]
                 )
-                print(f"✅ Batch {batch_num}/{total_batches} added")
+                log(f"✅ Batch {batch_num}/{total_batches} added")
             except Exception as e:
-                print(f"⚠️ Error adding batch {batch_num}: {e}")
+                tqdm.write(f"⚠️ Error adding batch {batch_num}: {e}")
                 continue
         
-        print(f"\n✅ Successfully added {len(documents)} documents!")
-        print(f"💾 Database now contains {self.collection.count()} total documents")
+        log(f"\n✅ Successfully added {len(documents)} documents!")
+        log(f"💾 Database now contains {self.collection.count()} total documents")
+    
+    def search(self, query: str, n_results: int = 5,
+               query_embedding: Optional[List[float]] = None) -> List[Dict]:
+        """Search for relevant documents
+        
+        Pass query_embedding when the query was already embedded (e.g. for
+        a cache lookup) to skip encoding it again.
+        """
+        return self.search_batch(
+            [query], n_results=n_results,
+            query_embeddings=None if query_embedding is None else [query_embedding]
+        )[0]
     
-    def search(self, query: str, n_results: int = 5) -> List[Dict]:
-        """Search for relevant documents"""
-        # Generate query embedding
-        query_embedding = self.embed_texts([query])[0]
+    def search_batch(self, queries: List[str], n_results: int = 5,
+                     query_embeddings: Optional[List[List[float]]] = None) -> List[List[Dict]]:
+        """Search for several queries at once
+        
+        All queries are embedded in one forward pass (unless their
+        embeddings are passed in) and sent to ChromaDB in one call; results
+        come back in the order of queries.
+        """
+        if not queries:
+            return []
+        
+        # Generate query embeddings
+        if query_embeddings is None:
+            query_embeddings = self.embed_texts(queries, show_progress=False)
         
         # Search in ChromaDB
         results = self.collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=query_embeddings,
             n_results=n_results
         )
         
-        # Format results
-        formatted_results = []
-        
-        if results['documents'] and results['documents'][0]:
-            for i in range(len(results['documents'][0])):
-                formatted_results.append({
-                    'document': results['documents'][0][i],
-                    'metadata': results['metadatas'][0][i],
-                    'distance': results['distances'][0][i] if 'distances' in results else None
-                })
+        # Format results, one list per query
+        all_results = []
+        for q in range(len(queries)):
+            formatted_results = []
+            
+            if results['documents'] and results['documents'][q]:
+                for i in range(len(results['documents'][q])):
+                    formatted_results.append({
+                        'document': results['documents'][q][i],
+                        'metadata': results['metadatas'][q][i],
+                        'distance': results['distances'][q][i] if 'distances' in results else None
+                    })
+            
+            all_results.append(formatted_results)
         
-        return formatted_results
+        return all_results
     
     def get_stats(self) -> Dict:
         """Get database statistics"""
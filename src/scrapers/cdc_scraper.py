@@ -5,6 +5,9 @@ import time
 from pathlib import Path
 from tqdm import tqdm
 
+from ..utils.cache import DiskCache, content_hash
+from ..utils.http import fetch
+
 class CDCScraper:
     """Scrape CDC.gov - FREE government health resource"""
     
@@ -13,8 +16,14 @@ class CDCScraper:
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Educational Project)'
         }
+        # Reuse connections across requests to the same host
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Parsed pages keyed by raw HTML hash, so unchanged pages skip parsing
+        self.page_cache = DiskCache(namespace="cdc_pages")
     
     def get_disease_pages(self, limit=None):
         """Get list of disease pages"""
@@ -31,7 +40,7 @@ class CDCScraper:
         
         for url in topic_urls:
             try:
-                response = requests.get(url, headers=self.headers, timeout=10)
+                response = fetch(self.session, url, timeout=10)
                 soup = BeautifulSoup(response.content, 'html.parser')
                 
                 # Find all disease links
@@ -63,7 +72,14 @@ class CDCScraper:
     def scrape_page(self, url):
         """Scrape individual CDC page"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = fetch(self.session, url, timeout=10)
+            
+            # Skip parsing if this exact page was parsed on a previous run
+            page_key = content_hash(url.encode('utf-8') + response.content)
+            cached = self.page_cache.get(page_key)
+            if cached is not None:
+                return cached
+            
             soup = BeautifulSoup(response.content, 'html.parser')
             
             content = {
@@ -88,6 +104,7 @@ class CDCScraper:
                             'text': text
                         })
             
+            self.page_cache.set(page_key, content)
             return content
             
         except Exception as e:
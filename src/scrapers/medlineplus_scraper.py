@@ -5,6 +5,9 @@ import time
 from pathlib import Path
 from tqdm import tqdm
 
+from ..utils.cache import DiskCache, content_hash
+from ..utils.http import fetch
+
 class MedlinePlusScraper:
     """Scrape MedlinePlus - FREE government health resource"""
     
@@ -13,8 +16,14 @@ class MedlinePlusScraper:
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Educational Health Project)'
         }
+        # Reuse connections across requests to the same host
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Parsed pages keyed by raw HTML hash, so unchanged pages skip parsing
+        self.page_cache = DiskCache(namespace="medlineplus_pages")
     
     def get_health_topics(self, limit=None):
         """Get list of health topics from multiple sources"""
@@ -35,7 +44,7 @@ class MedlinePlusScraper:
                 
                 for url in urls_to_try:
                     try:
-                        response = requests.get(url, headers=self.headers, timeout=10)
+                        response = fetch(self.session, url, timeout=10)
                         if response.status_code == 200:
                             soup = BeautifulSoup(response.content, 'html.parser')
                             
@@ -79,7 +88,7 @@ class MedlinePlusScraper:
             
             for url in index_urls:
                 try:
-                    response = requests.get(url, headers=self.headers, timeout=10)
+                    response = fetch(self.session, url, timeout=10)
                     if response.status_code == 200:
                         soup = BeautifulSoup(response.content, 'html.parser')
                         
@@ -185,11 +194,17 @@ class MedlinePlusScraper:
     def scrape_topic(self, topic_url):
         """Scrape individual topic page"""
         try:
-            response = requests.get(topic_url, headers=self.headers, timeout=15)
+            response = fetch(self.session, topic_url, timeout=15)
             
             if response.status_code != 200:
                 return None
             
+            # Skip parsing if this exact page was parsed on a previous run
+            page_key = content_hash(topic_url.encode('utf-8') + response.content)
+            cached = self.page_cache.get(page_key)
+            if cached is not None:
+                return cached
+            
             soup = BeautifulSoup(response.content, 'html.parser')
             
             # Extract content
@@ -270,6 +285,7 @@ class MedlinePlusScraper:
             
             # Only return if we got some content
             if content['title'] and (content['summary'] or content['sections']):
+                self.page_cache.set(page_key, content)
                 return content
             else:
                 return None
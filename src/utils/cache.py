@@ -0,0 +1,93 @@
+# src/utils/cache.py
+"""
+Pipeline Disk Cache
+- Content-hash keyed key/value store backed by sqlite3 (no extra dependency)
+- Lets repeat pipeline runs skip HTML parsing and embedding of unchanged content
+- Namespaced so each stage keeps its own entries
+"""
+
+import hashlib
+import pickle
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+# Bump when the format of any cached value changes to invalidate old entries
+CACHE_VERSION = 1
+
+def content_hash(content) -> str:
+    """Stable 128-bit hash of text or bytes (any buffer, e.g. a memoryview)"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+class DiskCache:
+    """Small persistent cache shared by the data pipeline stages"""
+
+    # sqlite's default limit on bound parameters is 999
+    _MAX_VARS = 500
+
+    def __init__(self, namespace: str, cache_file: str = "data/cache/pipeline_cache.sqlite3"):
+        self.namespace = namespace
+        self.cache_file = Path(cache_file)
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+
+        # Scrapers run in worker threads, so share one guarded connection
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.cache_file, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB)"
+        )
+        self._conn.commit()
+
+    def _key(self, key: str) -> str:
+        return f"v{CACHE_VERSION}:{self.namespace}:{key}"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a cached value"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ?", (self._key(key),)
+            ).fetchone()
+        return pickle.loads(row[0]) if row else default
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get all cached values for keys; missing keys are left out"""
+        full_keys = {self._key(k): k for k in keys}
+        pending = list(full_keys)
+        found = {}
+
+        with self._lock:
+            for i in range(0, len(pending), self._MAX_VARS):
+                batch = pending[i:i + self._MAX_VARS]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM cache WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for full_key, value in rows:
+                    found[full_keys[full_key]] = pickle.loads(value)
+
+        return found
+
+    def set(self, key: str, value: Any):
+        """Store a value"""
+        self.set_many({key: value})
+
+    def set_many(self, items: Dict[str, Any]):
+        """Store several values in one transaction"""
+        rows = [(self._key(k), pickle.dumps(v)) for k, v in items.items()]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Remove all entries in this namespace"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key LIKE ?", (f"v{CACHE_VERSION}:{self.namespace}:%",)
+            )
+            self._conn.commit()
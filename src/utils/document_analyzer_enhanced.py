@@ -8,18 +8,33 @@ Enhanced Medical Document Analyzer with Web Scraping
 """
 
 import io
+import os
 import re
 import requests
-from PIL import Image
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
 import json
 from bs4 import BeautifulSoup
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 class EnhancedDocumentAnalyzer:
     """Enhanced analyzer with web scraping capabilities"""
     
+    # Longest image side handed to OCR; enough for lab-report text at ~300 DPI
+    OCR_MAX_SIDE = 2500
+    # Resolution scanned PDF pages are rendered at before OCR
+    OCR_DPI = 300
+    
+    # One abnormal result in the plain-English report
+    ABNORMAL_RESULT_TMPL = (
+        "### {test}\n"
+        "**Your Value:** {value} {unit}\n"
+        "**Status:** {status}\n\n"
+        "**What this means:** {details}\n\n"
+        "**About this test:** {description}\n\n"
+    )
+    
     def __init__(self, rag_system=None):
         self.rag = rag_system  # Use existing RAG system for vector DB queries
         self.lab_reference_ranges = self._load_lab_references()
@@ -276,12 +291,70 @@ class EnhancedDocumentAnalyzer:
         
         return enhanced_info
     
-    def extract_text_from_pdf(self, file_bytes: bytes) -> str:
-        """Extract text from PDF file"""
+    @staticmethod
+    def _as_stream(file: Union[bytes, BinaryIO]) -> BinaryIO:
+        """Wrap raw bytes, or rewind an already-open binary file (e.g. an upload)"""
+        if isinstance(file, (bytes, bytearray)):
+            return io.BytesIO(file)
+        file.seek(0)
+        return file
+    
+    def extract_text_from_pdf(self, file: Union[bytes, BinaryIO]) -> str:
+        """Extract text from PDF file
+        
+        Uses PyMuPDF (much faster on multi-page reports) and falls back to
+        PyPDF2 when it is not installed. Scanned pages are OCR'd in parallel.
+        """
+        try:
+            import fitz
+        except ImportError:
+            return self._extract_text_from_pdf_pypdf(file)
+        
+        try:
+            with fitz.open(stream=self._as_stream(file), filetype="pdf") as doc:
+                texts = [page.get_text("text") for page in doc]
+                
+                # Pages with no text layer are scans; rasterize them here
+                # (PyMuPDF is not thread-safe) and OCR them below
+                scanned = {
+                    i: doc[i].get_pixmap(dpi=self.OCR_DPI, colorspace=fitz.csGRAY)
+                    for i, text in enumerate(texts) if not text.strip()
+                }
+            
+            if scanned:
+                for i, text in zip(scanned, self._ocr_pixmaps(list(scanned.values()))):
+                    texts[i] = text
+            return "\n".join(texts).strip()
+        except Exception as e:
+            return f"Error extracting PDF text: {str(e)}"
+    
+    @staticmethod
+    def _ocr_pixmaps(pixmaps: List) -> List[str]:
+        """OCR rendered PDF pages, several at once when there are many
+        
+        Tesseract runs as a subprocess, so worker threads scale with cores.
+        Returns empty strings when pytesseract is not installed.
+        """
+        try:
+            import pytesseract
+            from PIL import Image
+        except ImportError:
+            return [""] * len(pixmaps)
+        
+        def ocr(pix):
+            image = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+            return pytesseract.image_to_string(image)
+        
+        if len(pixmaps) == 1:
+            return [ocr(pixmaps[0])]
+        with ThreadPoolExecutor(max_workers=min(len(pixmaps), os.cpu_count() or 1)) as executor:
+            return list(executor.map(ocr, pixmaps))
+    
+    def _extract_text_from_pdf_pypdf(self, file: Union[bytes, BinaryIO]) -> str:
+        """Extract text from PDF file with PyPDF2"""
         try:
             import PyPDF2
-            pdf_file = io.BytesIO(file_bytes)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
+            pdf_reader = PyPDF2.PdfReader(self._as_stream(file))
             
             text = ""
             for page in pdf_reader.pages:
@@ -291,13 +364,18 @@ class EnhancedDocumentAnalyzer:
         except Exception as e:
             return f"Error extracting PDF text: {str(e)}"
     
-    def extract_text_from_image(self, image_bytes: bytes) -> str:
+    def extract_text_from_image(self, image: Union[bytes, BinaryIO]) -> str:
         """Extract text from image using OCR"""
         try:
             import pytesseract
             from PIL import Image
             
-            image = Image.open(io.BytesIO(image_bytes))
+            image = Image.open(self._as_stream(image))
+            # Phone photos are far larger than OCR needs; let the JPEG decoder
+            # scale down (and go greyscale) while decoding instead of after
+            if image.format == "JPEG":
+                image.draft("L", (self.OCR_MAX_SIDE, self.OCR_MAX_SIDE))
+            image.thumbnail((self.OCR_MAX_SIDE, self.OCR_MAX_SIDE))
             text = pytesseract.image_to_string(image)
             return text.strip()
         except ImportError:
@@ -430,24 +508,30 @@ I've analyzed your {document_type.lower()} and found {len(lab_results)} test res
         unknown = [r for r in lab_results if r['status'] == 'unknown']
         
         if abnormal:
-            report += "## ⚠️ Results Needing Attention\n\n"
+            # Build every card into one list and join once, rather than
+            # re-copying the growing report string for each line
+            parts = ["## ⚠️ Results Needing Attention\n\n"]
             for result in abnormal:
-                report += f"### {result['test']}\n"
-                report += f"**Your Value:** {result['value']} {result['unit']}\n"
-                report += f"**Status:** {result['status'].upper()}\n\n"
-                report += f"**What this means:** {result['details']}\n\n"
-                report += f"**About this test:** {result['description']}\n\n"
+                parts.append(self.ABNORMAL_RESULT_TMPL.format(
+                    test=result['test'],
+                    value=result['value'],
+                    unit=result['unit'],
+                    status=result['status'].upper(),
+                    details=result['details'],
+                    description=result['description']
+                ))
                 
                 # Add additional scraped information
                 if result.get('additional_info'):
-                    report += "**Additional Information:**\n"
+                    parts.append("**Additional Information:**\n")
                     for info in result['additional_info'][:2]:  # Limit to 2 sources
-                        report += f"- *Source: {info['source']}*\n"
+                        parts.append(f"- *Source: {info['source']}*\n")
                         content = info.get('description') or info.get('info', '')
                         if content:
-                            report += f"  {content[:200]}...\n\n"
+                            parts.append(f"  {content[:200]}...\n\n")
                 
-                report += "---\n\n"
+                parts.append("---\n\n")
+            report += "".join(parts)
         
         if normal:
             report += f"## ✅ Normal Results ({len(normal)})\n\n"
@@ -487,17 +571,21 @@ This analysis uses multiple trusted medical sources but is for educational purpo
         
         return report
     
-    def analyze_document(self, file_bytes: bytes, file_type: str, 
+    def analyze_document(self, file: Union[bytes, BinaryIO], file_type: str, 
                         gender: Optional[str] = None) -> Dict:
-        """Main analysis function with web scraping enhancement"""
+        """Main analysis function with web scraping enhancement
+        
+        file may be raw bytes or a binary file object such as a Streamlit
+        upload, which is read in place rather than copied first.
+        """
         
         # Extract text based on file type
         if file_type == 'application/pdf':
-            text = self.extract_text_from_pdf(file_bytes)
+            text = self.extract_text_from_pdf(file)
         elif file_type.startswith('image/'):
-            text = self.extract_text_from_image(file_bytes)
+            text = self.extract_text_from_image(file)
         elif file_type == 'text/plain':
-            text = file_bytes.decode('utf-8')
+            text = self._as_stream(file).read().decode('utf-8')
         else:
             return {'error': f'Unsupported file type: {file_type}'}
         
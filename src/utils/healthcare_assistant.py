@@ -1,7 +1,45 @@
 import json
+import re
 from pathlib import Path
 from datetime import datetime
 
+# Common medication keywords
+MEDICATION_KEYWORDS = [
+    'aspirin', 'ibuprofen', 'acetaminophen', 'tylenol', 'advil',
+    'metformin', 'lisinopril', 'atorvastatin', 'amlodipine',
+    'levothyroxine', 'omeprazole', 'simvastatin', 'losartan',
+    'gabapentin', 'hydrochlorothiazide', 'prednisone', 'amoxicillin'
+]
+_MEDICATION_RE = re.compile("|".join(map(re.escape, MEDICATION_KEYWORDS)))
+
+# Educational examples for the hospital finder
+BOSTON_HOSPITALS = [
+    {
+        'name': 'Massachusetts General Hospital',
+        'specialty': 'Comprehensive care, all specialties',
+        'address': '55 Fruit Street, Boston, MA 02114',
+        'phone': '(617) 726-2000',
+        'rating': '4.5/5',
+        'services': ['Emergency', 'Primary Care', 'Specialists', 'Surgery']
+    },
+    {
+        'name': 'Brigham and Women\'s Hospital',
+        'specialty': 'Cardiovascular, Cancer, Women\'s Health',
+        'address': '75 Francis Street, Boston, MA 02115',
+        'phone': '(617) 732-5500',
+        'rating': '4.6/5',
+        'services': ['Emergency', 'Cardiology', 'Oncology', 'OB/GYN']
+    },
+    {
+        'name': 'Beth Israel Deaconess Medical Center',
+        'specialty': 'Internal Medicine, Research',
+        'address': '330 Brookline Avenue, Boston, MA 02215',
+        'phone': '(617) 667-7000',
+        'rating': '4.4/5',
+        'services': ['Emergency', 'Internal Medicine', 'Research Programs']
+    }
+]
+
 class HealthcareAssistant:
     """AI Healthcare Assistant with conversation memory and medication tracking"""
     
@@ -47,20 +85,9 @@ class HealthcareAssistant:
     
     def _extract_medications(self, text):
         """Extract medication mentions from text"""
-        # Common medication keywords
-        med_keywords = [
-            'aspirin', 'ibuprofen', 'acetaminophen', 'tylenol', 'advil',
-            'metformin', 'lisinopril', 'atorvastatin', 'amlodipine',
-            'levothyroxine', 'omeprazole', 'simvastatin', 'losartan',
-            'gabapentin', 'hydrochlorothiazide', 'prednisone', 'amoxicillin'
-        ]
-        
-        text_lower = text.lower()
-        medications_found = []
-        
-        for med in med_keywords:
-            if med in text_lower:
-                medications_found.append(med.capitalize())
+        # One scan for every keyword, de-duplicated in order of mention
+        matches = _MEDICATION_RE.findall(text.lower())
+        medications_found = [med.capitalize() for med in dict.fromkeys(matches)]
         
         if medications_found:
             self._save_medications(medications_found)
@@ -93,6 +120,25 @@ class HealthcareAssistant:
         except:
             return []
     
+    def archive_messages(self, session_id, messages):
+        """Append chat turns that no longer fit in memory to the session's archive"""
+        archive_file = self._archive_file(session_id)
+        archive_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(archive_file, 'a') as f:
+            for message in messages:
+                f.write(json.dumps(message) + "\n")
+    
+    def get_archived_messages(self, session_id):
+        """Read back a session's archived chat turns, oldest first"""
+        try:
+            with open(self._archive_file(session_id), 'r') as f:
+                return [json.loads(line) for line in f]
+        except FileNotFoundError:
+            return []
+    
+    def _archive_file(self, session_id):
+        return self.data_dir / "archive" / f"{session_id}.jsonl"
+    
     def clear_conversation(self):
         """Clear conversation history"""
         with open(self.conversation_file, 'w') as f:
@@ -139,55 +185,25 @@ class HealthcareAssistant:
         """Get hospital suggestions based on location and condition"""
         
         # Educational examples - in production would use Google Maps API
-        hospitals = {
-            'boston': [
-                {
-                    'name': 'Massachusetts General Hospital',
-                    'specialty': 'Comprehensive care, all specialties',
-                    'address': '55 Fruit Street, Boston, MA 02114',
-                    'phone': '(617) 726-2000',
-                    'rating': '4.5/5',
-                    'services': ['Emergency', 'Primary Care', 'Specialists', 'Surgery']
-                },
-                {
-                    'name': 'Brigham and Women\'s Hospital',
-                    'specialty': 'Cardiovascular, Cancer, Women\'s Health',
-                    'address': '75 Francis Street, Boston, MA 02115',
-                    'phone': '(617) 732-5500',
-                    'rating': '4.6/5',
-                    'services': ['Emergency', 'Cardiology', 'Oncology', 'OB/GYN']
-                },
-                {
-                    'name': 'Beth Israel Deaconess Medical Center',
-                    'specialty': 'Internal Medicine, Research',
-                    'address': '330 Brookline Avenue, Boston, MA 02215',
-                    'phone': '(617) 667-7000',
-                    'rating': '4.4/5',
-                    'services': ['Emergency', 'Internal Medicine', 'Research Programs']
-                }
-            ],
-            'default': [
-                {
-                    'name': 'Search nearby hospitals',
-                    'info': f'Use Google Maps: Search "hospitals near {location}"',
-                    'action': 'Find hospitals in your area'
-                },
-                {
-                    'name': 'Your insurance provider',
-                    'info': 'Check your insurance card or website',
-                    'action': 'Find in-network hospitals'
-                },
-                {
-                    'name': 'Call 911',
-                    'info': 'For emergencies',
-                    'action': 'Emergency services will direct you'
-                }
-            ]
-        }
-        
         location_lower = location.lower() if location else ''
         
         if 'boston' in location_lower:
-            return hospitals['boston']
-        else:
-            return hospitals['default']
\ No newline at end of file
+            return BOSTON_HOSPITALS
+        
+        return [
+            {
+                'name': 'Search nearby hospitals',
+                'info': f'Use Google Maps: Search "hospitals near {location}"',
+                'action': 'Find hospitals in your area'
+            },
+            {
+                'name': 'Your insurance provider',
+                'info': 'Check your insurance card or website',
+                'action': 'Find in-network hospitals'
+            },
+            {
+                'name': 'Call 911',
+                'info': 'For emergencies',
+                'action': 'Emergency services will direct you'
+            }
+        ]
\ No newline at end of file
@@ -0,0 +1,74 @@
+# src/utils/http.py
+"""
+Polite HTTP Fetching for the Scrapers
+- Caps concurrent requests per host with a shared semaphore
+- Retries connection errors, timeouts, 429s and 5xx with exponential backoff
+- Honours the server's Retry-After header when it sends one
+"""
+
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+
+MAX_CONCURRENCY_PER_HOST = 16
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_host_semaphores: Dict[str, threading.Semaphore] = {}
+_host_semaphores_lock = threading.Lock()
+
+def host_semaphore(url: str) -> threading.Semaphore:
+    """Get the semaphore shared by every request to url's host"""
+    host = urlparse(url).netloc
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.Semaphore(MAX_CONCURRENCY_PER_HOST)
+        return _host_semaphores[host]
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    """Seconds the server asked us to wait, if it said"""
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None  # HTTP-date form; fall back to our own backoff
+
+def fetch(session: requests.Session, url: str, max_retries: int = 5,
+          **kwargs) -> requests.Response:
+    """GET url through session, retrying transient failures
+
+    Returns the response (callers still check status_code); re-raises the
+    last connection error if every attempt failed without a response.
+    """
+    response = None
+    last_error = None
+
+    for attempt in range(max_retries):
+        # Hold the host slot only while the request is in flight, not while
+        # backing off, so other workers keep making progress
+        with host_semaphore(url):
+            try:
+                response = session.get(url, **kwargs)
+                last_error = None
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response = None
+                last_error = e
+
+        if response is not None and response.status_code not in RETRY_STATUS_CODES:
+            return response
+        if attempt == max_retries - 1:
+            break
+
+        delay = _retry_after(response) if response is not None else None
+        if delay is None:
+            delay = 2 ** attempt + random.random()
+        time.sleep(delay)
+
+    if response is not None:
+        return response
+    raise last_error
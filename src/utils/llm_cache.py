@@ -0,0 +1,71 @@
+# src/utils/llm_cache.py
+"""
+Persistent LLM Response Cache
+- Low-temperature prompts (specialist explanations, insights) are close to
+  deterministic, so their answers are kept on disk across restarts
+- Keyed on sha256 of (model, messages, temperature, max_tokens)
+- Higher-temperature calls go straight to the client's in-memory cache
+- cached_stream is the streaming counterpart, sharing the same entries
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+
+from .cache import DiskCache
+
+# Above this the same prompt is expected to vary, so answers are not persisted
+MAX_CACHED_TEMPERATURE = 0.3
+
+@lru_cache(maxsize=1)
+def _disk_cache() -> DiskCache:
+    """Open the shared cache once per process"""
+    return DiskCache(namespace="llm", cache_file="data/cache/llm_cache.sqlite3")
+
+def _cache_key(model: str, messages, temperature: float, max_tokens: int) -> str:
+    payload = json.dumps([model, messages, temperature, max_tokens], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def cached_generate(llm, messages, temperature: float = 0.3, max_tokens: int = 2000) -> str:
+    """llm.generate, answered from disk when this exact prompt was seen before"""
+    if temperature > MAX_CACHED_TEMPERATURE:
+        return llm.generate(messages, temperature=temperature, max_tokens=max_tokens)
+
+    key = _cache_key(getattr(llm, 'model', ''), messages, temperature, max_tokens)
+    cache = _disk_cache()
+    response = cache.get(key)
+    if response is not None:
+        return response
+
+    response = llm.generate(messages, temperature=temperature, max_tokens=max_tokens)
+
+    # Errors and empty replies are never cached so the next attempt retries the API
+    if response and not response.startswith("❌"):
+        cache.set(key, response)
+    return response
+
+def cached_stream(llm, messages, temperature: float = 0.3, max_tokens: int = 2000):
+    """llm.stream, replaying the stored answer when this exact prompt was seen before
+
+    A completed stream is written back under the same key cached_generate uses.
+    """
+    if temperature > MAX_CACHED_TEMPERATURE:
+        yield from llm.stream(messages, temperature=temperature, max_tokens=max_tokens)
+        return
+
+    key = _cache_key(getattr(llm, 'model', ''), messages, temperature, max_tokens)
+    cache = _disk_cache()
+    response = cache.get(key)
+    if response is not None:
+        yield response
+        return
+
+    pieces = []
+    for piece in llm.stream(messages, temperature=temperature, max_tokens=max_tokens):
+        pieces.append(piece)
+        yield piece
+
+    # The client reports failures as a "❌" piece; neither those nor an empty
+    # stream are cached
+    if pieces and not any(piece.startswith("❌") for piece in pieces):
+        cache.set(key, "".join(pieces))
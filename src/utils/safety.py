@@ -1,3 +1,5 @@
+import re
+
 class SafetyChecker:
     """Detect emergency symptoms and safety concerns"""
     
@@ -53,6 +55,15 @@ class SafetyChecker:
             "severe headache", "worst headache of life",
             "stiff neck with fever"
         ]
+        
+        # One precompiled alternation per level, so a query is scanned once
+        # per level instead of once per keyword
+        self.emergency_pattern = self._compile(self.emergency_keywords)
+        self.urgent_pattern = self._compile(self.urgent_keywords)
+    
+    @staticmethod
+    def _compile(keywords):
+        return re.compile("|".join(re.escape(k) for k in keywords), re.IGNORECASE)
     
     def check_query(self, query: str) -> dict:
         """
@@ -61,25 +72,23 @@ class SafetyChecker:
         Returns:
             dict with 'level', 'message', and 'keyword_triggered'
         """
-        query_lower = query.lower()
-        
         # Check for emergencies
-        for keyword in self.emergency_keywords:
-            if keyword in query_lower:
-                return {
-                    'level': 'EMERGENCY',
-                    'message': self._get_emergency_message(),
-                    'keyword_triggered': keyword
-                }
+        match = self.emergency_pattern.search(query)
+        if match:
+            return {
+                'level': 'EMERGENCY',
+                'message': self._get_emergency_message(),
+                'keyword_triggered': match.group(0).lower()
+            }
         
         # Check for urgent care needs
-        for keyword in self.urgent_keywords:
-            if keyword in query_lower:
-                return {
-                    'level': 'URGENT',
-                    'message': self._get_urgent_message(),
-                    'keyword_triggered': keyword
-                }
+        match = self.urgent_pattern.search(query)
+        if match:
+            return {
+                'level': 'URGENT',
+                'message': self._get_urgent_message(),
+                'keyword_triggered': match.group(0).lower()
+            }
         
         # No safety concerns
         return {
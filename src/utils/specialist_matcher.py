@@ -8,6 +8,12 @@ from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import re
 
+from .llm_cache import cached_generate
+from .tokens import truncate_to_tokens
+
+# Sequence markers some models leak into their replies
+_LLM_SENTINEL_RE = re.compile(r"</?s>")
+
 class SpecialistMatcher:
     """Matches symptoms/conditions to appropriate medical specialists"""
     
@@ -324,13 +330,14 @@ class SpecialistMatcher:
         
         try:
             rag_result = self.rag.query(query, n_results=2)
+            medical_context = truncate_to_tokens(rag_result['answer'], 200)
             
             prompt = f"""Based on these symptoms: {', '.join(symptoms)}
 
 Recommended specialist: {top_specialist['name']}
 
 Medical context:
-{rag_result['answer'][:800]}
+{medical_context}
 
 Provide a brief explanation (3-4 sentences) of:
 1. Why this specialist is recommended
@@ -339,12 +346,12 @@ Provide a brief explanation (3-4 sentences) of:
 
 Keep it practical and reassuring."""
             
-            explanation = self.rag.llm.generate([
+            explanation = cached_generate(self.rag.llm, [
                 {"role": "system", "content": "You are a helpful medical guide explaining specialist referrals."},
                 {"role": "user", "content": prompt}
             ], temperature=0.3, max_tokens=400)
             
-            return explanation.replace('<s>', '').replace('</s>', '').strip()
+            return _LLM_SENTINEL_RE.sub('', explanation).strip()
         
         except:
             return ""
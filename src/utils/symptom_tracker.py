@@ -1,7 +1,6 @@
 import json
 from pathlib import Path
 from datetime import datetime, timedelta
-import pandas as pd
 from collections import Counter
 
 class SymptomTracker:
@@ -11,6 +10,12 @@ class SymptomTracker:
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.symptoms_file = self.data_dir / "symptom_log.json"
+        
+        # Parsed log and its insights, reused until the file changes on disk
+        self._symptoms = None
+        self._symptoms_mtime = None
+        self._insights = None
+        self._insights_mtime = None
     
     def log_symptom(self, symptom_description, severity, notes=""):
         """Log a symptom entry"""
@@ -31,20 +36,33 @@ class SymptomTracker:
         }
         
         symptoms.append(entry)
-        
-        with open(self.symptoms_file, 'w') as f:
-            json.dump(symptoms, f, indent=2)
+        self._save(symptoms)
         
         return entry
     
     def get_all_symptoms(self):
-        """Get all symptom entries"""
+        """Get all symptom entries
+        
+        The tracker is shared across reruns, so the file is only parsed
+        again when its modification time changes.
+        """
         try:
-            with open(self.symptoms_file, 'r') as f:
-                return json.load(f)
+            mtime = self.symptoms_file.stat().st_mtime_ns
+            if mtime != self._symptoms_mtime:
+                with open(self.symptoms_file, 'r') as f:
+                    self._symptoms = json.load(f)
+                self._symptoms_mtime = mtime
+            return list(self._symptoms)
         except:
             return []
     
+    def _save(self, symptoms):
+        """Write the log and keep it as the in-memory copy"""
+        with open(self.symptoms_file, 'w') as f:
+            json.dump(symptoms, f, indent=2)
+        self._symptoms = symptoms
+        self._symptoms_mtime = self.symptoms_file.stat().st_mtime_ns
+    
     def _get_time_period(self, dt):
         """Categorize time of day"""
         hour = dt.hour
@@ -58,21 +76,31 @@ class SymptomTracker:
             return "Night"
     
     def get_ai_insights(self):
-        """Generate AI-ready insights from symptom data"""
+        """Generate AI-ready insights from symptom data
+        
+        The pandas pass only reruns when the log has changed since the
+        last call.
+        """
         symptoms = self.get_all_symptoms()
         
         if len(symptoms) < 3:
             return None
         
+        if self._insights is not None and self._insights_mtime == self._symptoms_mtime:
+            return self._insights
+        
+        import pandas as pd
         df = pd.DataFrame(symptoms)
         
-        # Day of week analysis
-        day_pattern = df['day_of_week'].value_counts().to_dict()
-        most_common_day = df['day_of_week'].value_counts().index[0]
+        # Day of week analysis (each count is computed once and reused)
+        day_counts = df['day_of_week'].value_counts()
+        day_pattern = day_counts.to_dict()
+        most_common_day = day_counts.index[0]
         
         # Time of day analysis
-        time_pattern = df['time_of_day'].value_counts().to_dict()
-        most_common_time = df['time_of_day'].value_counts().index[0]
+        time_counts = df['time_of_day'].value_counts()
+        time_pattern = time_counts.to_dict()
+        most_common_time = time_counts.index[0]
         
         # Severity analysis
         avg_severity = df['severity'].mean()
@@ -90,13 +118,15 @@ class SymptomTracker:
             trend = "stable"
         
         # Symptom frequency
-        symptom_counts = df['symptom'].value_counts().to_dict()
-        most_common_symptom = df['symptom'].value_counts().index[0]
+        symptom_value_counts = df['symptom'].value_counts()
+        symptom_counts = symptom_value_counts.to_dict()
+        most_common_symptom = symptom_value_counts.index[0]
         
-        # Weekend vs weekday
+        # Weekend vs weekday, summed from the day counts rather than
+        # filtering the frame twice
         weekdays = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-        weekday_count = len(df[df['day_of_week'].isin(weekdays)])
-        weekend_count = len(df[~df['day_of_week'].isin(weekdays)])
+        weekday_count = int(day_counts.reindex(weekdays, fill_value=0).sum())
+        weekend_count = len(df) - weekday_count
         
         insights = {
             'total_entries': len(symptoms),
@@ -117,6 +147,8 @@ class SymptomTracker:
             }
         }
         
+        self._insights = insights
+        self._insights_mtime = self._symptoms_mtime
         return insights
     
     def generate_insight_text(self):
@@ -156,6 +188,4 @@ Day-by-day breakdown:
         """Delete a symptom entry"""
         symptoms = self.get_all_symptoms()
         symptoms = [s for s in symptoms if s['id'] != entry_id]
-        
-        with open(self.symptoms_file, 'w') as f:
-            json.dump(symptoms, f, indent=2)
\ No newline at end of file
+        self._save(symptoms)
\ No newline at end of file
@@ -0,0 +1,46 @@
+# src/utils/tokens.py
+"""
+Prompt Token Budgeting
+- Truncates context to a token budget instead of a character count
+- Uses tiktoken's cl100k_base encoding when installed
+- Falls back to a word-boundary cut at ~4 characters per token
+"""
+
+from functools import lru_cache
+
+CHARS_PER_TOKEN = 4
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """Load the tokenizer once per process (None if it is unavailable)
+
+    The first get_encoding call downloads the BPE file, which fails offline;
+    any failure falls back to the character estimate, and since the None is
+    cached the download is not retried on every call.
+    """
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except ImportError:
+        return None
+    except Exception as e:
+        print(f"⚠️ tiktoken encoding unavailable ({e}), estimating tokens from length")
+        return None
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Clip text to at most max_tokens, never cutting a word in half"""
+    encoding = _encoding()
+    if encoding is None:
+        limit = max_tokens * CHARS_PER_TOKEN
+        if len(text) <= limit:
+            return text
+        clipped = text[:limit]
+    else:
+        tokens = encoding.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        clipped = encoding.decode(tokens[:max_tokens])
+
+    # Drop the trailing partial word
+    head, sep, _ = clipped.rpartition(' ')
+    return head if sep else clipped
@@ -9,7 +9,7 @@ User Profile Management System
 import json
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 
 class UserProfile:
     """Manages user health profile and preferences"""
@@ -83,10 +83,21 @@ class UserProfile:
         with open(self.profile_file, 'w') as f:
             json.dump(self.profile_data, f, indent=2)
     
+    @property
+    def version(self) -> str:
+        """Changes on every save or reset, so callers can use it as a cache key"""
+        return self.profile_data.get('updated_at', '')
+    
     def is_setup_complete(self) -> bool:
         """Check if user has completed profile setup"""
         return self.profile_data.get('is_setup_complete', False)
     
+    def needs_onboarding(self) -> bool:
+        """True until the profile has at least a name and a valid age"""
+        basic = self.profile_data.get('basic_info', {})
+        age = basic.get('age')
+        return not (basic.get('name') and isinstance(age, (int, float)) and age > 0)
+    
     def mark_setup_complete(self):
         """Mark profile setup as complete"""
         self.profile_data['is_setup_complete'] = True
@@ -135,6 +146,10 @@ class UserProfile:
             self.profile_data['health_info']['allergies'].append(allergy)
             self._save_profile()
     
+    def add_allergies(self, allergies: Iterable[str]):
+        """Add several allergies with a single save"""
+        self._extend_unique('allergies', allergies)
+    
     def remove_allergy(self, allergy: str):
         """Remove an allergy"""
         if allergy in self.profile_data['health_info']['allergies']:
@@ -147,6 +162,21 @@ class UserProfile:
             self.profile_data['health_info']['chronic_conditions'].append(condition)
             self._save_profile()
     
+    def add_conditions(self, conditions: Iterable[str]):
+        """Add several chronic conditions with a single save"""
+        self._extend_unique('chronic_conditions', conditions)
+    
+    def _extend_unique(self, field: str, items: Iterable[str]):
+        """Append new, stripped, non-empty items to a health_info list in order"""
+        existing = self.profile_data['health_info'][field]
+        new_items = [
+            item for item in dict.fromkeys(filter(None, map(str.strip, items)))
+            if item not in existing
+        ]
+        if new_items:
+            existing.extend(new_items)
+            self._save_profile()
+    
     def remove_condition(self, condition: str):
         """Remove a chronic condition"""
         if condition in self.profile_data['health_info']['chronic_conditions']:
@@ -196,18 +226,23 @@ class UserProfile:
         # Calculate BMI if height and weight available
         bmi = None
         bmi_category = None
+        bmi_color = None
         if health.get('height') and health.get('weight'):
             height_m = health['height'] / 100
             bmi = health['weight'] / (height_m ** 2)
             
             if bmi < 18.5:
                 bmi_category = "Underweight"
+                bmi_color = "🟡"
             elif bmi < 25:
                 bmi_category = "Normal"
+                bmi_color = "🟢"
             elif bmi < 30:
                 bmi_category = "Overweight"
+                bmi_color = "🟡"
             else:
                 bmi_category = "Obese"
+                bmi_color = "🔴"
         
         return {
             'name': basic.get('name', 'User'),
@@ -215,6 +250,7 @@ class UserProfile:
             'gender': basic.get('gender'),
             'bmi': round(bmi, 1) if bmi else None,
             'bmi_category': bmi_category,
+            'bmi_color': bmi_color,
             'allergies_count': len(health.get('allergies', [])),
             'conditions_count': len(health.get('chronic_conditions', [])),
             'medications_count': len(health.get('current_medications', [])),